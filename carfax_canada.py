@@ -1,808 +1,1159 @@
-from playwright.sync_api import sync_playwright
+import argparse
 import json
-import pandas as pd
+import os
+import sys
 import time
 import re
 from datetime import datetime
-from openpyxl import load_workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
 from urllib.parse import urljoin
 
+from images import collect_image_urls, run_image_stage
+from profiling import REPORT_NAME, RunProfiler
+import search_index
+from title_parser import parse_title, seed_from_dir, seed_from_runs
 
-def scrape_curve_motors_perfect():
+
+EXPORT_FORMATS = ('json', 'csv', 'xlsx', 'fts')
+DEFAULT_FORMATS = ('json', 'csv', 'xlsx')
+
+INVENTORY_URL = 'https://www.curvemotors.ca/cars'
+
+# Multiplier for the fixed waits (see pause); replay defaults to REPLAY_PAUSE_SCALE
+PAUSE_SCALE = 1.0
+REPLAY_PAUSE_SCALE = 0.1
+
+# Wait per scroll / "Load More" step of the listing. Never scaled: with shorter
+# waits a replay can stop before every card loaded and see fewer vehicles than the recording
+INVENTORY_PAUSE = 2
+
+COLUMN_ORDER = [
+    'Vehicle ID', 'Year', 'Make', 'Model', 'Title', 'VIN', 'Stock Number',
+    'Condition', 'Original Price', 'Sale Price', 'Special Price', 'Weekly Payment',
+    'Odometer', 'Body Style', 'Engine', 'Engine Size', 'Transmission', 'Drivetrain',
+    'Fuel Type', 'City Fuel Economy', 'Highway Fuel Economy',
+    'Exterior Color', 'Interior Color', 'Doors', 'Passengers',
+    'Description', 'Number of Photos', 'Image Count',
+    'Main Image URL', 'All Image URLs',
+    'Detail Page URL', 'Contact Us URL',
+    'Carfax Report URL', 'Carfax VIN', 'Carfax Report Number', 'Carfax Report Date',
+    'Carfax Last Odometer', 'Carfax Country of Assembly',
+    'Total History Records', 'Accident Summary', 'Accident Details',
+    'Service Records Count', 'Service Records Summary',
+    'Registration Summary', 'Number of Owners', 'First Owner Date',
+    'Open Recalls', 'Stolen Status', 'US History',
+    'Dealer Phone', 'Dealer Address'
+]
+
+
+def pause(seconds):
+    """Fixed wait for dynamic content, scaled by PAUSE_SCALE (replay runs shorten it)."""
+    time.sleep(seconds * PAUSE_SCALE)
+
+
+def new_browser_context(p, headless=False, record_har=None, replay_har=None):
+    """
+    Chromium browser + context with a desktop viewport and user agent.
+    - record_har: save every response of the run to this HAR (.har.zip keeps bodies as separate files);
+      written when the context is closed
+    - replay_har: serve responses from this HAR only, requests it does not contain are aborted
+    """
+    browser = p.chromium.launch(headless=headless)
+
+    context_options = {
+        'viewport': {'width': 1920, 'height': 1080},
+        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    if record_har:
+        os.makedirs(os.path.dirname(os.path.abspath(record_har)), exist_ok=True)
+        context_options['record_har_path'] = record_har
+    context = browser.new_context(**context_options)
+
+    if replay_har:
+        context.route_from_har(replay_har, not_found='abort')
+
+    return browser, context
+
+
+def load_inventory(page, url=INVENTORY_URL):
+    """Open /cars and scroll / click "Load More" until no new vehicle cards appear."""
+    print("📄 Loading main inventory page...")
+    page.goto(url, timeout=60000)
+    page.wait_for_selector('[id^="vehicle-"]', timeout=10000)
+
+    print("📜 Scrolling to load ALL vehicles...")
+    previous_count = 0
+    no_change_count = 0
+    scroll_attempts = 0
+
+    while scroll_attempts < 15:
+        page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+        time.sleep(INVENTORY_PAUSE)
+
+        load_more = page.query_selector('button:has-text("Load More"), .load-more')
+        if load_more:
+            try:
+                load_more.click()
+                time.sleep(INVENTORY_PAUSE)
+            except:
+                pass
+
+        current_count = len(page.query_selector_all('[id^="vehicle-"]'))
+        print(f"   Loaded {current_count} vehicles...")
+
+        if current_count == previous_count:
+            no_change_count += 1
+            if no_change_count >= 3:
+                break
+        else:
+            no_change_count = 0
+
+        previous_count = current_count
+        scroll_attempts += 1
+
+    vehicle_cards = page.query_selector_all('[id^="vehicle-"]')
+    total_vehicles = len(vehicle_cards)
+
+    print(f"\n✅ Found {total_vehicles} vehicles")
+    print("-" * 80 + "\n")
+
+    return vehicle_cards
+
+
+def parse_card(card):
+    """Listing-card fields of one vehicle. None if the card has no detail link."""
+    vehicle_data = {}
+
+    # Vehicle ID
+    vehicle_id = card.get_attribute('id').replace('vehicle-', '')
+    vehicle_data['Vehicle ID'] = vehicle_id
+
+    # Detail URL
+    detail_link = card.query_selector('a[href*="/cars/used/"]')
+    if not detail_link:
+        return None
+
+    detail_url = urljoin('https://www.curvemotors.ca', detail_link.get_attribute('href'))
+    vehicle_data['Detail Page URL'] = detail_url
+    vehicle_data[
+        'Contact Us URL'] = f"https://www.curvemotors.ca/forms/contact-us?selected_vehicle={vehicle_id}"
+
+    # ========================================
+    # MAIN PAGE DATA
+    # ========================================
+
+    # Odometer
+    odo_elem = card.query_selector('.p__odometer')
+    if odo_elem:
+        odo_match = re.search(r'([\d,]+)', odo_elem.inner_text())
+        vehicle_data['Odometer'] = int(odo_match.group(1).replace(',', '')) if odo_match else 'N/A'
+    else:
+        vehicle_data['Odometer'] = 'N/A'
+
+    # Prices
+    orig_elem = card.query_selector('.inventory_p__sellprice_line del')
+    if orig_elem:
+        orig_match = re.search(r'([\d,]+)', orig_elem.inner_text())
+        vehicle_data['Original Price'] = int(
+            orig_match.group(1).replace(',', '')) if orig_match else 'N/A'
+    else:
+        vehicle_data['Original Price'] = 'N/A'
+
+    all_prices = card.query_selector_all('.inventory_p__price')
+    if all_prices:
+        sale_match = re.search(r'([\d,]+)', all_prices[-1].inner_text())
+        vehicle_data['Sale Price'] = int(sale_match.group(1).replace(',', '')) if sale_match else 'N/A'
+    else:
+        vehicle_data['Sale Price'] = vehicle_data['Original Price']
+
+    vehicle_data['Special Price'] = 'Yes' if card.query_selector('.ribbon-special-price') else 'No'
+
+    # VIN
+    vin_elem = card.query_selector('[data-cg-vin]')
+    vehicle_data['VIN'] = vin_elem.get_attribute('data-cg-vin') if vin_elem else 'N/A'
+
+    # Carfax URL
+    carfax_link = card.query_selector('a[href*="carfax"]')
+    carfax_url = carfax_link.get_attribute('href') if carfax_link else None
+    vehicle_data['Carfax Report URL'] = carfax_url if carfax_url else 'N/A'
+
+    # Basic specs
+    def get_spec(label):
+        elem = card.query_selector(f'.inventory_div__cell:has-text("{label}") .right-in-left')
+        return elem.inner_text().strip() if elem else 'N/A'
+
+    vehicle_data['Body Style'] = get_spec('Body Style')
+    vehicle_data['Fuel Type'] = get_spec('Fuel Type')
+    vehicle_data['Exterior Color'] = get_spec('Exterior')
+    vehicle_data['Interior Color'] = get_spec('Interior')
+    vehicle_data['Transmission'] = get_spec('Transmission')
+    vehicle_data['Engine'] = get_spec('Engine')
+    vehicle_data['Drivetrain'] = get_spec('Drivetrain')
+
+    # Doors
+    doors_text = get_spec('Doors')
+    if doors_text != 'N/A':
+        doors_match = re.search(r'(\d+)', doors_text)
+        vehicle_data['Doors'] = int(doors_match.group(1)) if doors_match else 'N/A'
+    else:
+        vehicle_data['Doors'] = 'N/A'
+
+    # Stock Number
+    stock_elem = card.query_selector('.inventory_div__cell:has-text("Stock #") .right-in-left')
+    vehicle_data['Stock Number'] = stock_elem.inner_text().strip() if stock_elem else 'N/A'
+
+    # Photos
+    photo_elem = card.query_selector('.bg-photo span')
+    if photo_elem:
+        photo_match = re.search(r'(\d+)', photo_elem.inner_text())
+        vehicle_data['Number of Photos'] = int(photo_match.group(1)) if photo_match else 0
+    else:
+        vehicle_data['Number of Photos'] = 0
+
+    # Main Image
+    main_img = card.query_selector('.carItem_fixed_size_img')
+    vehicle_data['Main Image URL'] = main_img.get_attribute('src') if main_img else 'N/A'
+
+    return vehicle_data
+
+
+def scrape_detail_page(context, vehicle_data):
+    """
+    Title, Year/Make/Model, description, specs, images and dealer info.
+    Returns the error that was caught (fields fall back to N/A), else None.
+    """
+    detail_url = vehicle_data['Detail Page URL']
+
+    detail_page = None
+    try:
+        detail_page = context.new_page()
+        detail_page.goto(detail_url, timeout=60000)
+        detail_page.wait_for_load_state('domcontentloaded')
+        pause(2)
+
+        # TITLE EXTRACTION
+        complete_title = 'N/A'
+
+        title_elem = detail_page.query_selector(
+            '.DetaileProductCustomrWeb-title, p[class*="DetaileProductCustomrWeb-title"]')
+        if title_elem:
+            complete_title = title_elem.inner_text().strip()
+
+        if not complete_title or complete_title == 'N/A' or len(complete_title) < 10:
+            page_title = detail_page.title()
+            if page_title:
+                complete_title = page_title.split(' - ')[
+                    0].strip() if ' - ' in page_title else page_title.strip()
+
+        if not complete_title or complete_title == 'N/A' or len(complete_title) < 10:
+            og_title = detail_page.query_selector('meta[property="og:title"]')
+            if og_title:
+                complete_title = og_title.get_attribute('content')
+
+        if not complete_title or complete_title == 'N/A':
+            url_part = detail_url.split('/')[-1]
+            url_part = re.sub(r'-\d{6,}$', '', url_part)
+            complete_title = url_part.replace('-', ' ').title()
+
+        vehicle_data['Title'] = complete_title if complete_title else 'N/A'
+
+        # YEAR, MAKE, MODEL
+        vehicle_data['Year'], vehicle_data['Make'], vehicle_data['Model'] = parse_title(
+            vehicle_data['Title'])
+
+        print(
+            f"              📝 {vehicle_data.get('Year')} {vehicle_data.get('Make')} {vehicle_data.get('Model')}")
+        print(f"              💰 ${vehicle_data.get('Sale Price', 0):,}" if isinstance(
+            vehicle_data.get('Sale Price'),
+            int) else f"              💰 {vehicle_data.get('Sale Price')}")
+
+        # DESCRIPTION
+        desc_elem = detail_page.query_selector('.DetaileProductCustomrWeb-description-text')
+        if desc_elem:
+            desc_text = desc_elem.inner_text().strip()
+            vehicle_data['Description'] = desc_text if len(desc_text) > 20 else 'N/A'
+
+            payment_match = re.search(r'FINANCE FOR \$(\d+\.?\d*) A WEEK', desc_text, re.IGNORECASE)
+            vehicle_data['Weekly Payment'] = float(payment_match.group(1)) if payment_match else 'N/A'
+        else:
+            vehicle_data['Description'] = 'N/A'
+            vehicle_data['Weekly Payment'] = 'N/A'
+
+        # ADDITIONAL SPECS
+        vehicle_data['Condition'] = 'N/A'
+        vehicle_data['Engine Size'] = 'N/A'
+        vehicle_data['City Fuel Economy'] = 'N/A'
+        vehicle_data['Highway Fuel Economy'] = 'N/A'
+        vehicle_data['Passengers'] = 'N/A'
+
+        spec_cards = detail_page.query_selector_all('.vehicle-detail-list-card')
+        for spec_card in spec_cards:
+            try:
+                label = spec_card.query_selector('.vehicle-detail-list-label')
+                value = spec_card.query_selector('.vehicle-detail-list-value')
+
+                if label and value:
+                    label_text = label.inner_text().strip()
+                    value_text = value.inner_text().strip()
+
+                    if 'Condition' in label_text:
+                        vehicle_data['Condition'] = value_text
+                    elif 'Engine Size' in label_text:
+                        vehicle_data['Engine Size'] = value_text
+                    elif 'City Fuel' in label_text:
+                        vehicle_data['City Fuel Economy'] = value_text
+                    elif 'Hwy Fuel' in label_text or 'Highway Fuel' in label_text:
+                        vehicle_data['Highway Fuel Economy'] = value_text
+                    elif 'Passengers' in label_text or '# of Passengers' in label_text:
+                        pass_match = re.search(r'(\d+)', value_text)
+                        vehicle_data['Passengers'] = int(pass_match.group(1)) if pass_match else 'N/A'
+            except:
+                continue
+
+        # IMAGES
+        image_elems = detail_page.query_selector_all('img[src*="azureedge.net/curvemotors"]')
+        image_urls = collect_image_urls(img.get_attribute('src') for img in image_elems)
+
+        vehicle_data['Image URLs'] = image_urls  # full list, JSON only
+        vehicle_data['All Image URLs'] = ', '.join(image_urls[:20]) if image_urls else 'N/A'
+        vehicle_data['Image Count'] = len(image_urls)
+
+        # DEALER INFO
+        phone = None
+        phone_elem = detail_page.query_selector('a[href^="Tel:"], a[href^="tel:"]')
+        if phone_elem:
+            phone = phone_elem.inner_text().strip()
+            if not phone:
+                href = phone_elem.get_attribute('href')
+                if href:
+                    phone = href.replace('tel:', '').replace('Tel:', '').strip()
+
+        if not phone:
+            try:
+                page_text = detail_page.inner_text('body')
+                phone_match = re.search(r'(\d{3}[-.\s]?\d{3}[-.\s]?\d{4})', page_text)
+                if phone_match:
+                    phone = phone_match.group(1)
+            except:
+                pass
+
+        vehicle_data['Dealer Phone'] = phone if phone else '416-752-2220'
+
+        addr_elem = detail_page.query_selector('address strong, address')
+        vehicle_data[
+            'Dealer Address'] = addr_elem.inner_text().strip() if addr_elem else '3210 Weston Rd, North York, ON M9M 2T4'
+
+    except Exception as e:
+        print(f"              ⚠️  Detail page error: {str(e)[:50]}")
+        vehicle_data.setdefault('Title', 'N/A')
+        vehicle_data.setdefault('Year', 'N/A')
+        vehicle_data.setdefault('Make', 'N/A')
+        vehicle_data.setdefault('Model', 'N/A')
+        vehicle_data.setdefault('Description', 'N/A')
+        vehicle_data.setdefault('Dealer Phone', '416-752-2220')
+        vehicle_data.setdefault('Dealer Address', '3210 Weston Rd, North York, ON M9M 2T4')
+        return e
+
+    finally:
+        if detail_page:
+            detail_page.close()
+
+
+def scrape_carfax(context, vehicle_data, all_carfax_history):
+    """
+    Carfax summary fields; history rows are appended to all_carfax_history.
+    Returns the error that was caught (fields keep their defaults), else None.
+    """
+    carfax_url = vehicle_data['Carfax Report URL']
+
+    # Initialize ALL fields with N/A
+    vehicle_data['Carfax VIN'] = 'N/A'
+    vehicle_data['Carfax Report Number'] = 'N/A'
+    vehicle_data['Carfax Report Date'] = 'N/A'
+    vehicle_data['Carfax Last Odometer'] = 'N/A'
+    vehicle_data['Carfax Country of Assembly'] = 'N/A'
+    vehicle_data['Total History Records'] = 0  # Number
+    vehicle_data['Accident Summary'] = 'No accidents reported'
+    vehicle_data['Accident Details'] = 'N/A'  # FIXED
+    vehicle_data['Service Records Count'] = 0  # Number - FIXED
+    vehicle_data['Service Records Summary'] = 'N/A'
+    vehicle_data['Registration Summary'] = 'N/A'
+    vehicle_data['Open Recalls'] = 'N/A'
+    vehicle_data['Stolen Status'] = 'Not stolen'
+    vehicle_data['US History'] = 'N/A'
+    vehicle_data['Number of Owners'] = 0  # Number - FIXED
+    vehicle_data['First Owner Date'] = 'N/A'
+
+    if carfax_url and carfax_url != 'N/A':
+        carfax_page = None
+        try:
+            print(f"              📋 Carfax...", end='', flush=True)
+            carfax_page = context.new_page()
+
+            carfax_page.goto(carfax_url, timeout=50000)
+
+            try:
+                carfax_page.wait_for_selector('.vin-text, .info', timeout=8000)
+            except:
+                pass
+
+            pause(4)  # Wait for dynamic content
+
+            try:
+                carfax_page.wait_for_selector('#detailed-history-table tbody tr, .mobile-table-row',
+                                              timeout=5000)
+            except:
+                pass
+
+            # VIN
+            vin_elem = carfax_page.query_selector('.vin-text, p.vin-text')
+            if vin_elem:
+                vehicle_data['Carfax VIN'] = vin_elem.inner_text().strip()
+
+            # Report info
+            try:
+                info_text = carfax_page.inner_text('.info')
+                if info_text:
+                    num_match = re.search(r'Report.*?#?:?\s*(\d+)', info_text)
+                    if num_match:
+                        vehicle_data['Carfax Report Number'] = num_match.group(1)
+
+                    date_match = re.search(r'Report Date:?\s*([^\n]+)', info_text)
+                    if date_match:
+                        vehicle_data['Carfax Report Date'] = date_match.group(1).strip()
+            except:
+                pass
+
+            # Country
+            coa = carfax_page.query_selector('.coa-value p')
+            if coa:
+                vehicle_data['Carfax Country of Assembly'] = coa.inner_text().strip()
+
+            # Odometer
+            odo_elem = carfax_page.query_selector('.odo-value p')
+            if odo_elem:
+                odo_text = odo_elem.inner_text().strip()
+                odo_match = re.search(r'([\d,]+)', odo_text)
+                if odo_match:
+                    vehicle_data['Carfax Last Odometer'] = int(odo_match.group(1).replace(',', ''))
+
+            # TILES - SUMMARY DATA
+            tiles = carfax_page.query_selector_all('.tile')
+            for tile in tiles:
+                try:
+                    tile_text = tile.inner_text()
+
+                    # ACCIDENT DATA - ENHANCED
+                    if 'Accident' in tile_text or 'Damage' in tile_text:
+                        p = tile.query_selector('p')
+                        if p:
+                            vehicle_data['Accident Summary'] = p.inner_text().strip()
+
+                    # SERVICE RECORDS - ENHANCED
+                    elif 'Service' in tile_text or 'Record' in tile_text:
+                        p = tile.query_selector('p')
+                        if p:
+                            summary = p.inner_text().strip()
+                            vehicle_data['Service Records Summary'] = summary
+                            # Extract number
+                            match = re.search(r'(\d+)', summary)
+                            if match:
+                                vehicle_data['Service Records Count'] = int(match.group(1))
+
+                    elif 'Registered' in tile_text or 'Registration' in tile_text:
+                        strong = tile.query_selector('strong')
+                        if strong:
+                            vehicle_data['Registration Summary'] = strong.inner_text().strip()
+
+                    elif 'Recall' in tile_text:
+                        p = tile.query_selector('p')
+                        if p:
+                            vehicle_data['Open Recalls'] = p.inner_text().strip()
+
+                    elif 'Stolen' in tile_text:
+                        div = tile.query_selector('div, p')
+                        if div:
+                            vehicle_data['Stolen Status'] = div.inner_text().strip()
+
+                    elif 'U.S.' in tile_text or 'US' in tile_text:
+                        p = tile.query_selector('p')
+                        if p:
+                            vehicle_data['US History'] = p.inner_text().strip()
+                except:
+                    continue
+
+            # DETAILED HISTORY - ENHANCED FOR ACCIDENT DETAILS & OWNERS
+            history_rows = []
+
+            selectors = [
+                '#detailed-history-table tbody tr',
+                '.detailed-history tbody tr',
+                'table tbody tr',
+                '.content-desktop tbody tr'
+            ]
+
+            for selector in selectors:
+                history_rows = carfax_page.query_selector_all(selector)
+                if history_rows and len(history_rows) > 0:
+                    break
+
+            # Try mobile view
+            if not history_rows or len(history_rows) == 0:
+                mobile_rows = carfax_page.query_selector_all('.mobile-table-row')
+                if mobile_rows and len(mobile_rows) > 0:
+                    vehicle_data['Total History Records'] = len(mobile_rows)
+                    print(f" ✅ {len(mobile_rows)} mobile records", flush=True)
+            else:
+                vehicle_data['Total History Records'] = len(history_rows)
+
+                owner_count = 0
+                first_date = 'N/A'
+                accident_details_list = []
+
+                for row in history_rows:
+                    try:
+                        cells = row.query_selector_all('td')
+                        if len(cells) >= 5:
+                            date_text = cells[1].inner_text().strip() if len(cells) > 1 else ''
+                            odo_text = cells[2].inner_text().strip() if len(cells) > 2 else ''
+                            source_text = cells[3].inner_text().strip() if len(cells) > 3 else ''
+                            type_text = cells[4].inner_text().strip() if len(cells) > 4 else ''
+                            details_text = cells[5].inner_text().strip() if len(cells) > 5 else ''
+
+                            # Save to history
+                            history_record = {
+                                'Vehicle ID': vehicle_data['Vehicle ID'],
+                                'VIN': vehicle_data.get('Carfax VIN'),
+                                'Year': vehicle_data.get('Year'),
+                                'Make': vehicle_data.get('Make'),
+                                'Model': vehicle_data.get('Model'),
+                                'Date': date_text,
+                                'Odometer': odo_text,
+                                'Source': source_text,
+                                'Record Type': type_text,
+                                'Details': details_text
+                            }
+                            all_carfax_history.append(history_record)
+
+                            # EXTRACT ACCIDENT DETAILS
+                            if 'accident' in type_text.lower() or 'accident' in details_text.lower() or 'damage' in details_text.lower():
+                                accident_info = f"{date_text}: {details_text[:100]}"
+                                accident_details_list.append(accident_info)
+
+                            # COUNT OWNERS
+                            if 'First Owner' in details_text:
+                                first_date = date_text
+                                owner_count += 1
+                            elif 'New Owner' in details_text or 'Owner reported' in details_text:
+                                owner_count += 1
+                    except:
+                        continue
+
+                # Set accident details if found
+                if accident_details_list:
+                    vehicle_data['Accident Details'] = ' | '.join(
+                        accident_details_list[:3])  # First 3 accidents
+
+                # Set owner info
+                vehicle_data['Number of Owners'] = owner_count if owner_count > 0 else 0
+                vehicle_data['First Owner Date'] = first_date
+
+                print(f" ✅ {len(history_rows)} records", flush=True)
+
+            # Also check accident section for more details
+            if vehicle_data['Accident Details'] == 'N/A':
+                try:
+                    accident_section = carfax_page.query_selector('#accident-damage-section')
+                    if accident_section:
+                        accident_rows = accident_section.query_selector_all(
+                            '.mobile-table-row, tbody tr')
+                        accident_info_list = []
+                        for acc_row in accident_rows[:3]:  # Max 3
+                            acc_text = acc_row.inner_text().strip()
+                            if acc_text and len(acc_text) > 10:
+                                # Clean up and shorten
+                                acc_text = acc_text.replace('\n', ' ')[:150]
+                                accident_info_list.append(acc_text)
+
+                        if accident_info_list:
+                            vehicle_data['Accident Details'] = ' | '.join(accident_info_list)
+                except:
+                    pass
+
+        except Exception as e:
+            print(f" ⚠️  Error: {str(e)[:30]}", flush=True)
+            return e
+
+        finally:
+            if carfax_page:
+                carfax_page.close()
+
+
+def scrape_curve_motors_perfect(images_dir=None, headless=False, limit=None, formats=DEFAULT_FORMATS, output_dir='.',
+                                profile_dir=None, slow_seconds=30, python_profiler='cprofile',
+                                record_har=None, replay_har=None, pause_scale=None):
     """
     PERFECT FINAL VERSION
     - All fields populated (N/A if missing)
     - Improved Carfax extraction for: accident details, service records, owners, history
     - Complete data coverage
+    - images_dir: also download images there and flag photos reused across vehicles
+    - limit: only scrape the first N vehicles of the listing
+    - formats / output_dir: which exports to write, and where
+    - profile_dir: Python profile, memory per phase and Playwright traces of
+      vehicles slower than slow_seconds (or failing), see profiling.py
+    - record_har / replay_har: capture the run's network traffic, or rerun
+      offline from a capture; pause_scale scales the fixed waits on detail and
+      Carfax pages (default 1, or REPLAY_PAUSE_SCALE when replaying) - the
+      listing always loads with INVENTORY_PAUSE
     """
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        context = browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        )
+    from playwright.sync_api import sync_playwright
 
-        page = context.new_page()
-        all_vehicles = []
-        all_carfax_history = []
+    global PAUSE_SCALE
 
-        print("=" * 80)
-        print("🚗 CURVE MOTORS - PERFECT FINAL VERSION")
-        print("=" * 80)
-        print(f"⏰ Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    seed_from_dir(output_dir)
 
-        start_time = time.time()
+    if replay_har:
+        print(f"📼 Replaying network from {replay_har}")
+    elif record_har:
+        print(f"⏺️  Recording network to {record_har}")
 
-        try:
-            # ========================================
-            # LOAD ALL VEHICLES
-            # ========================================
+    profiler = RunProfiler(profile_dir, slow_seconds=slow_seconds, python_profiler=python_profiler)
+    profiler.start()
 
-            print("📄 Loading main inventory page...")
-            page.goto('https://www.curvemotors.ca/cars', timeout=60000)
-            page.wait_for_selector('[id^="vehicle-"]', timeout=10000)
+    # Scaled waits for this run only - restored below
+    default_pause_scale = PAUSE_SCALE
+    if pause_scale is not None:
+        PAUSE_SCALE = pause_scale
+    elif replay_har:
+        PAUSE_SCALE = REPLAY_PAUSE_SCALE
 
-            print("📜 Scrolling to load ALL vehicles...")
-            previous_count = 0
-            no_change_count = 0
-            scroll_attempts = 0
+    try:
+        with sync_playwright() as p:
+            browser, context = new_browser_context(p, headless=headless, record_har=record_har,
+                                                   replay_har=replay_har)
+            profiler.attach(context)
+            profiler.checkpoint('browser launch')
+
+            page = context.new_page()
+            all_vehicles = []
+            all_carfax_history = []
+            total_vehicles = 0
+
+            print("=" * 80)
+            print("🚗 CURVE MOTORS - PERFECT FINAL VERSION")
+            print("=" * 80)
+            print(f"⏰ Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+            start_time = time.time()
 
-            while scroll_attempts < 15:
-                page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                time.sleep(2)
+            try:
+                # ========================================
+                # LOAD ALL VEHICLES
+                # ========================================
 
-                load_more = page.query_selector('button:has-text("Load More"), .load-more')
-                if load_more:
+                vehicle_cards = load_inventory(page)
+                if limit is not None:
+                    vehicle_cards = vehicle_cards[:limit]
+                total_vehicles = len(vehicle_cards)
+                profiler.checkpoint('load inventory')
+
+                # ========================================
+                # SCRAPE EACH VEHICLE
+                # ========================================
+
+                for idx, card in enumerate(vehicle_cards, 1):
                     try:
-                        load_more.click()
-                        time.sleep(2)
-                    except:
-                        pass
+                        vehicle_data = parse_card(card)
+                        if not vehicle_data:
+                            print(f"[{idx}/{total_vehicles}] ⏭️  Skipping - no link\n")
+                            continue
 
-                current_count = len(page.query_selector_all('[id^="vehicle-"]'))
-                print(f"   Loaded {current_count} vehicles...")
+                        print(f"[{idx}/{total_vehicles}] 📄 {vehicle_data['Detail Page URL'].split('/')[-1][:40]}...")
 
-                if current_count == previous_count:
-                    no_change_count += 1
-                    if no_change_count >= 3:
-                        break
-                else:
-                    no_change_count = 0
+                        with profiler.vehicle(vehicle_data['Vehicle ID']) as record:
+                            record['detail_error'] = scrape_detail_page(context, vehicle_data)
+                            record['carfax_error'] = scrape_carfax(context, vehicle_data, all_carfax_history)
 
-                previous_count = current_count
-                scroll_attempts += 1
+                        all_vehicles.append(vehicle_data)
+                        print(f"              ✅ Complete\n")
 
-            vehicle_cards = page.query_selector_all('[id^="vehicle-"]')
-            total_vehicles = len(vehicle_cards)
+                        pause(0.8)
+
+                    except Exception as e:
+                        print(f"[{idx}/{total_vehicles}] ❌ Fatal: {str(e)[:60]}\n")
+                        continue
 
-            print(f"\n✅ Found {total_vehicles} vehicles")
-            print("-" * 80 + "\n")
+            except Exception as e:
+                print(f"\n❌ Main error: {str(e)}")
+
+            finally:
+                profiler.detach()
+                context.close()  # writes the HAR when recording
+                browser.close()
+
+            profiler.checkpoint('scrape vehicles')
+
+            elapsed = time.time() - start_time
+            mins = int(elapsed // 60)
+            secs = int(elapsed % 60)
 
             # ========================================
-            # SCRAPE EACH VEHICLE
+            # OPTIONAL IMAGE STAGE
             # ========================================
 
-            for idx, card in enumerate(vehicle_cards, 1):
+            extra_metadata = {}
+            if images_dir and all_vehicles:
                 try:
-                    vehicle_data = {}
+                    _, extra_metadata['reused_photos'] = run_image_stage(all_vehicles, store_dir=images_dir)
+                except Exception as e:
+                    print(f"⚠️  Image stage error: {str(e)[:60]}")
+                profiler.checkpoint('image stage')
 
-                    # Vehicle ID
-                    vehicle_id = card.get_attribute('id').replace('vehicle-', '')
-                    vehicle_data['Vehicle ID'] = vehicle_id
+            if profile_dir:
+                extra_metadata['profile_report'] = os.path.join(profile_dir, REPORT_NAME)
 
-                    # Detail URL
-                    detail_link = card.query_selector('a[href*="/cars/used/"]')
-                    if not detail_link:
-                        print(f"[{idx}/{total_vehicles}] ⏭️  Skipping - no link\n")
-                        continue
+            export_results(all_vehicles, all_carfax_history, total_vehicles, mins, secs, extra_metadata,
+                           formats=formats, output_dir=output_dir)
+            profiler.checkpoint('export')
 
-                    detail_url = urljoin('https://www.curvemotors.ca', detail_link.get_attribute('href'))
-                    vehicle_data['Detail Page URL'] = detail_url
-                    vehicle_data[
-                        'Contact Us URL'] = f"https://www.curvemotors.ca/forms/contact-us?selected_vehicle={vehicle_id}"
-
-                    # ========================================
-                    # MAIN PAGE DATA
-                    # ========================================
-
-                    # Odometer
-                    odo_elem = card.query_selector('.p__odometer')
-                    if odo_elem:
-                        odo_match = re.search(r'([\d,]+)', odo_elem.inner_text())
-                        vehicle_data['Odometer'] = int(odo_match.group(1).replace(',', '')) if odo_match else 'N/A'
-                    else:
-                        vehicle_data['Odometer'] = 'N/A'
-
-                    # Prices
-                    orig_elem = card.query_selector('.inventory_p__sellprice_line del')
-                    if orig_elem:
-                        orig_match = re.search(r'([\d,]+)', orig_elem.inner_text())
-                        vehicle_data['Original Price'] = int(
-                            orig_match.group(1).replace(',', '')) if orig_match else 'N/A'
-                    else:
-                        vehicle_data['Original Price'] = 'N/A'
-
-                    all_prices = card.query_selector_all('.inventory_p__price')
-                    if all_prices:
-                        sale_match = re.search(r'([\d,]+)', all_prices[-1].inner_text())
-                        vehicle_data['Sale Price'] = int(sale_match.group(1).replace(',', '')) if sale_match else 'N/A'
-                    else:
-                        vehicle_data['Sale Price'] = vehicle_data['Original Price']
-
-                    vehicle_data['Special Price'] = 'Yes' if card.query_selector('.ribbon-special-price') else 'No'
-
-                    # VIN
-                    vin_elem = card.query_selector('[data-cg-vin]')
-                    vehicle_data['VIN'] = vin_elem.get_attribute('data-cg-vin') if vin_elem else 'N/A'
-
-                    # Carfax URL
-                    carfax_link = card.query_selector('a[href*="carfax"]')
-                    carfax_url = carfax_link.get_attribute('href') if carfax_link else None
-                    vehicle_data['Carfax Report URL'] = carfax_url if carfax_url else 'N/A'
-
-                    # Basic specs
-                    def get_spec(label):
-                        elem = card.query_selector(f'.inventory_div__cell:has-text("{label}") .right-in-left')
-                        return elem.inner_text().strip() if elem else 'N/A'
-
-                    vehicle_data['Body Style'] = get_spec('Body Style')
-                    vehicle_data['Fuel Type'] = get_spec('Fuel Type')
-                    vehicle_data['Exterior Color'] = get_spec('Exterior')
-                    vehicle_data['Interior Color'] = get_spec('Interior')
-                    vehicle_data['Transmission'] = get_spec('Transmission')
-                    vehicle_data['Engine'] = get_spec('Engine')
-                    vehicle_data['Drivetrain'] = get_spec('Drivetrain')
-
-                    # Doors
-                    doors_text = get_spec('Doors')
-                    if doors_text != 'N/A':
-                        doors_match = re.search(r'(\d+)', doors_text)
-                        vehicle_data['Doors'] = int(doors_match.group(1)) if doors_match else 'N/A'
-                    else:
-                        vehicle_data['Doors'] = 'N/A'
-
-                    # Stock Number
-                    stock_elem = card.query_selector('.inventory_div__cell:has-text("Stock #") .right-in-left')
-                    vehicle_data['Stock Number'] = stock_elem.inner_text().strip() if stock_elem else 'N/A'
-
-                    # Photos
-                    photo_elem = card.query_selector('.bg-photo span')
-                    if photo_elem:
-                        photo_match = re.search(r'(\d+)', photo_elem.inner_text())
-                        vehicle_data['Number of Photos'] = int(photo_match.group(1)) if photo_match else 0
-                    else:
-                        vehicle_data['Number of Photos'] = 0
-
-                    # Main Image
-                    main_img = card.query_selector('.carItem_fixed_size_img')
-                    vehicle_data['Main Image URL'] = main_img.get_attribute('src') if main_img else 'N/A'
-
-                    print(f"[{idx}/{total_vehicles}] 📄 {detail_url.split('/')[-1][:40]}...")
-
-                    # ========================================
-                    # DETAIL PAGE
-                    # ========================================
-
-                    detail_page = None
-                    try:
-                        detail_page = context.new_page()
-                        detail_page.goto(detail_url, timeout=60000)
-                        detail_page.wait_for_load_state('domcontentloaded')
-                        time.sleep(2)
-
-                        # TITLE EXTRACTION
-                        complete_title = 'N/A'
-
-                        title_elem = detail_page.query_selector(
-                            '.DetaileProductCustomrWeb-title, p[class*="DetaileProductCustomrWeb-title"]')
-                        if title_elem:
-                            complete_title = title_elem.inner_text().strip()
-
-                        if not complete_title or complete_title == 'N/A' or len(complete_title) < 10:
-                            page_title = detail_page.title()
-                            if page_title:
-                                complete_title = page_title.split(' - ')[
-                                    0].strip() if ' - ' in page_title else page_title.strip()
-
-                        if not complete_title or complete_title == 'N/A' or len(complete_title) < 10:
-                            og_title = detail_page.query_selector('meta[property="og:title"]')
-                            if og_title:
-                                complete_title = og_title.get_attribute('content')
-
-                        if not complete_title or complete_title == 'N/A':
-                            url_part = detail_url.split('/')[-1]
-                            url_part = re.sub(r'-\d{6,}$', '', url_part)
-                            complete_title = url_part.replace('-', ' ').title()
-
-                        vehicle_data['Title'] = complete_title if complete_title else 'N/A'
-
-                        # YEAR, MAKE, MODEL
-                        if complete_title and complete_title != 'N/A':
-                            year_match = re.search(r'\b(19|20)\d{2}\b', complete_title)
-                            vehicle_data['Year'] = int(year_match.group(0)) if year_match else 'N/A'
-
-                            if year_match:
-                                after_year = complete_title[year_match.end():].strip()
-                                words = after_year.split()
-
-                                vehicle_data['Make'] = words[0] if words else 'N/A'
-
-                                stop_words = {
-                                    'CARGO', 'VAN', 'AWD', 'FWD', 'RWD', '4X4', '4WD',
-                                    'WITH', 'SPORT', 'LIMITED', 'LTD', 'SLT', 'SE', 'EX', 'LX',
-                                    'FULLY', 'LOADED', 'LOW', 'KM', 'BACKUP', 'CAMERA',
-                                    'CRUISE', 'CONTROL', 'LEATHER', 'SUNROOF', 'NAVIGATION',
-                                    'SHELVES', 'SEATS', '*', '/', '-'
-                                }
-
-                                model_words = []
-                                for word in words[1:]:
-                                    if word.upper() in stop_words or not word.replace('-', '').isalnum():
-                                        break
-                                    model_words.append(word)
-                                    if len(model_words) >= 3:
-                                        break
-
-                                vehicle_data['Model'] = ' '.join(model_words) if model_words else (
-                                    words[1] if len(words) > 1 else 'N/A')
-                            else:
-                                vehicle_data['Make'] = 'N/A'
-                                vehicle_data['Model'] = 'N/A'
-                        else:
-                            vehicle_data['Year'] = 'N/A'
-                            vehicle_data['Make'] = 'N/A'
-                            vehicle_data['Model'] = 'N/A'
-
-                        print(
-                            f"              📝 {vehicle_data.get('Year')} {vehicle_data.get('Make')} {vehicle_data.get('Model')}")
-                        print(f"              💰 ${vehicle_data.get('Sale Price', 0):,}" if isinstance(
-                            vehicle_data.get('Sale Price'),
-                            int) else f"              💰 {vehicle_data.get('Sale Price')}")
-
-                        # DESCRIPTION
-                        desc_elem = detail_page.query_selector('.DetaileProductCustomrWeb-description-text')
-                        if desc_elem:
-                            desc_text = desc_elem.inner_text().strip()
-                            vehicle_data['Description'] = desc_text if len(desc_text) > 20 else 'N/A'
-
-                            payment_match = re.search(r'FINANCE FOR \$(\d+\.?\d*) A WEEK', desc_text, re.IGNORECASE)
-                            vehicle_data['Weekly Payment'] = float(payment_match.group(1)) if payment_match else 'N/A'
-                        else:
-                            vehicle_data['Description'] = 'N/A'
-                            vehicle_data['Weekly Payment'] = 'N/A'
-
-                        # ADDITIONAL SPECS
-                        vehicle_data['Condition'] = 'N/A'
-                        vehicle_data['Engine Size'] = 'N/A'
-                        vehicle_data['City Fuel Economy'] = 'N/A'
-                        vehicle_data['Highway Fuel Economy'] = 'N/A'
-                        vehicle_data['Passengers'] = 'N/A'
-
-                        spec_cards = detail_page.query_selector_all('.vehicle-detail-list-card')
-                        for spec_card in spec_cards:
-                            try:
-                                label = spec_card.query_selector('.vehicle-detail-list-label')
-                                value = spec_card.query_selector('.vehicle-detail-list-value')
-
-                                if label and value:
-                                    label_text = label.inner_text().strip()
-                                    value_text = value.inner_text().strip()
-
-                                    if 'Condition' in label_text:
-                                        vehicle_data['Condition'] = value_text
-                                    elif 'Engine Size' in label_text:
-                                        vehicle_data['Engine Size'] = value_text
-                                    elif 'City Fuel' in label_text:
-                                        vehicle_data['City Fuel Economy'] = value_text
-                                    elif 'Hwy Fuel' in label_text or 'Highway Fuel' in label_text:
-                                        vehicle_data['Highway Fuel Economy'] = value_text
-                                    elif 'Passengers' in label_text or '# of Passengers' in label_text:
-                                        pass_match = re.search(r'(\d+)', value_text)
-                                        vehicle_data['Passengers'] = int(pass_match.group(1)) if pass_match else 'N/A'
-                            except:
-                                continue
-
-                        # IMAGES
-                        image_elems = detail_page.query_selector_all('img[src*="azureedge.net/curvemotors"]')
-                        image_urls = []
-                        for img in image_elems:
-                            src = img.get_attribute('src')
-                            if src and 'logo' not in src.lower() and 'icon' not in src.lower():
-                                full_url = src.replace('thumb-', '')
-                                if full_url not in image_urls:
-                                    image_urls.append(full_url)
-
-                        vehicle_data['All Image URLs'] = ', '.join(image_urls[:20]) if image_urls else 'N/A'
-                        vehicle_data['Image Count'] = len(image_urls)
-
-                        # DEALER INFO
-                        phone = None
-                        phone_elem = detail_page.query_selector('a[href^="Tel:"], a[href^="tel:"]')
-                        if phone_elem:
-                            phone = phone_elem.inner_text().strip()
-                            if not phone:
-                                href = phone_elem.get_attribute('href')
-                                if href:
-                                    phone = href.replace('tel:', '').replace('Tel:', '').strip()
-
-                        if not phone:
-                            try:
-                                page_text = detail_page.inner_text('body')
-                                phone_match = re.search(r'(\d{3}[-.\s]?\d{3}[-.\s]?\d{4})', page_text)
-                                if phone_match:
-                                    phone = phone_match.group(1)
-                            except:
-                                pass
-
-                        vehicle_data['Dealer Phone'] = phone if phone else '416-752-2220'
-
-                        addr_elem = detail_page.query_selector('address strong, address')
-                        vehicle_data[
-                            'Dealer Address'] = addr_elem.inner_text().strip() if addr_elem else '3210 Weston Rd, North York, ON M9M 2T4'
+            return all_vehicles, all_carfax_history
+    finally:
+        PAUSE_SCALE = default_pause_scale
+        profiler.stop()
 
-                    except Exception as e:
-                        print(f"              ⚠️  Detail page error: {str(e)[:50]}")
-                        vehicle_data.setdefault('Title', 'N/A')
-                        vehicle_data.setdefault('Year', 'N/A')
-                        vehicle_data.setdefault('Make', 'N/A')
-                        vehicle_data.setdefault('Model', 'N/A')
-                        vehicle_data.setdefault('Description', 'N/A')
-                        vehicle_data.setdefault('Dealer Phone', '416-752-2220')
-                        vehicle_data.setdefault('Dealer Address', '3210 Weston Rd, North York, ON M9M 2T4')
-
-                    finally:
-                        if detail_page:
-                            detail_page.close()
-
-                    # ========================================
-                    # CARFAX - ENHANCED FOR MISSING FIELDS
-                    # ========================================
-
-                    # Initialize ALL fields with N/A
-                    vehicle_data['Carfax VIN'] = 'N/A'
-                    vehicle_data['Carfax Report Number'] = 'N/A'
-                    vehicle_data['Carfax Report Date'] = 'N/A'
-                    vehicle_data['Carfax Last Odometer'] = 'N/A'
-                    vehicle_data['Carfax Country of Assembly'] = 'N/A'
-                    vehicle_data['Total History Records'] = 0  # Number
-                    vehicle_data['Accident Summary'] = 'No accidents reported'
-                    vehicle_data['Accident Details'] = 'N/A'  # FIXED
-                    vehicle_data['Service Records Count'] = 0  # Number - FIXED
-                    vehicle_data['Service Records Summary'] = 'N/A'
-                    vehicle_data['Registration Summary'] = 'N/A'
-                    vehicle_data['Open Recalls'] = 'N/A'
-                    vehicle_data['Stolen Status'] = 'Not stolen'
-                    vehicle_data['US History'] = 'N/A'
-                    vehicle_data['Number of Owners'] = 0  # Number - FIXED
-                    vehicle_data['First Owner Date'] = 'N/A'
-
-                    if carfax_url and carfax_url != 'N/A':
-                        carfax_page = None
-                        try:
-                            print(f"              📋 Carfax...", end='', flush=True)
-                            carfax_page = context.new_page()
-
-                            carfax_page.goto(carfax_url, timeout=50000)
-
-                            try:
-                                carfax_page.wait_for_selector('.vin-text, .info', timeout=8000)
-                            except:
-                                pass
-
-                            time.sleep(4)  # Wait for dynamic content
-
-                            try:
-                                carfax_page.wait_for_selector('#detailed-history-table tbody tr, .mobile-table-row',
-                                                              timeout=5000)
-                            except:
-                                pass
-
-                            # VIN
-                            vin_elem = carfax_page.query_selector('.vin-text, p.vin-text')
-                            if vin_elem:
-                                vehicle_data['Carfax VIN'] = vin_elem.inner_text().strip()
-
-                            # Report info
-                            try:
-                                info_text = carfax_page.inner_text('.info')
-                                if info_text:
-                                    num_match = re.search(r'Report.*?#?:?\s*(\d+)', info_text)
-                                    if num_match:
-                                        vehicle_data['Carfax Report Number'] = num_match.group(1)
-
-                                    date_match = re.search(r'Report Date:?\s*([^\n]+)', info_text)
-                                    if date_match:
-                                        vehicle_data['Carfax Report Date'] = date_match.group(1).strip()
-                            except:
-                                pass
-
-                            # Country
-                            coa = carfax_page.query_selector('.coa-value p')
-                            if coa:
-                                vehicle_data['Carfax Country of Assembly'] = coa.inner_text().strip()
-
-                            # Odometer
-                            odo_elem = carfax_page.query_selector('.odo-value p')
-                            if odo_elem:
-                                odo_text = odo_elem.inner_text().strip()
-                                odo_match = re.search(r'([\d,]+)', odo_text)
-                                if odo_match:
-                                    vehicle_data['Carfax Last Odometer'] = int(odo_match.group(1).replace(',', ''))
-
-                            # TILES - SUMMARY DATA
-                            tiles = carfax_page.query_selector_all('.tile')
-                            for tile in tiles:
-                                try:
-                                    tile_text = tile.inner_text()
-
-                                    # ACCIDENT DATA - ENHANCED
-                                    if 'Accident' in tile_text or 'Damage' in tile_text:
-                                        p = tile.query_selector('p')
-                                        if p:
-                                            vehicle_data['Accident Summary'] = p.inner_text().strip()
-
-                                    # SERVICE RECORDS - ENHANCED
-                                    elif 'Service' in tile_text or 'Record' in tile_text:
-                                        p = tile.query_selector('p')
-                                        if p:
-                                            summary = p.inner_text().strip()
-                                            vehicle_data['Service Records Summary'] = summary
-                                            # Extract number
-                                            match = re.search(r'(\d+)', summary)
-                                            if match:
-                                                vehicle_data['Service Records Count'] = int(match.group(1))
-
-                                    elif 'Registered' in tile_text or 'Registration' in tile_text:
-                                        strong = tile.query_selector('strong')
-                                        if strong:
-                                            vehicle_data['Registration Summary'] = strong.inner_text().strip()
-
-                                    elif 'Recall' in tile_text:
-                                        p = tile.query_selector('p')
-                                        if p:
-                                            vehicle_data['Open Recalls'] = p.inner_text().strip()
-
-                                    elif 'Stolen' in tile_text:
-                                        div = tile.query_selector('div, p')
-                                        if div:
-                                            vehicle_data['Stolen Status'] = div.inner_text().strip()
-
-                                    elif 'U.S.' in tile_text or 'US' in tile_text:
-                                        p = tile.query_selector('p')
-                                        if p:
-                                            vehicle_data['US History'] = p.inner_text().strip()
-                                except:
-                                    continue
-
-                            # DETAILED HISTORY - ENHANCED FOR ACCIDENT DETAILS & OWNERS
-                            history_rows = []
-
-                            selectors = [
-                                '#detailed-history-table tbody tr',
-                                '.detailed-history tbody tr',
-                                'table tbody tr',
-                                '.content-desktop tbody tr'
-                            ]
-
-                            for selector in selectors:
-                                history_rows = carfax_page.query_selector_all(selector)
-                                if history_rows and len(history_rows) > 0:
-                                    break
-
-                            # Try mobile view
-                            if not history_rows or len(history_rows) == 0:
-                                mobile_rows = carfax_page.query_selector_all('.mobile-table-row')
-                                if mobile_rows and len(mobile_rows) > 0:
-                                    vehicle_data['Total History Records'] = len(mobile_rows)
-                                    print(f" ✅ {len(mobile_rows)} mobile records", flush=True)
-                            else:
-                                vehicle_data['Total History Records'] = len(history_rows)
-
-                                owner_count = 0
-                                first_date = 'N/A'
-                                accident_details_list = []
-
-                                for row in history_rows:
-                                    try:
-                                        cells = row.query_selector_all('td')
-                                        if len(cells) >= 5:
-                                            date_text = cells[1].inner_text().strip() if len(cells) > 1 else ''
-                                            odo_text = cells[2].inner_text().strip() if len(cells) > 2 else ''
-                                            source_text = cells[3].inner_text().strip() if len(cells) > 3 else ''
-                                            type_text = cells[4].inner_text().strip() if len(cells) > 4 else ''
-                                            details_text = cells[5].inner_text().strip() if len(cells) > 5 else ''
-
-                                            # Save to history
-                                            history_record = {
-                                                'Vehicle ID': vehicle_data['Vehicle ID'],
-                                                'VIN': vehicle_data.get('Carfax VIN'),
-                                                'Year': vehicle_data.get('Year'),
-                                                'Make': vehicle_data.get('Make'),
-                                                'Model': vehicle_data.get('Model'),
-                                                'Date': date_text,
-                                                'Odometer': odo_text,
-                                                'Source': source_text,
-                                                'Record Type': type_text,
-                                                'Details': details_text
-                                            }
-                                            all_carfax_history.append(history_record)
-
-                                            # EXTRACT ACCIDENT DETAILS
-                                            if 'accident' in type_text.lower() or 'accident' in details_text.lower() or 'damage' in details_text.lower():
-                                                accident_info = f"{date_text}: {details_text[:100]}"
-                                                accident_details_list.append(accident_info)
-
-                                            # COUNT OWNERS
-                                            if 'First Owner' in details_text:
-                                                first_date = date_text
-                                                owner_count += 1
-                                            elif 'New Owner' in details_text or 'Owner reported' in details_text:
-                                                owner_count += 1
-                                    except:
-                                        continue
-
-                                # Set accident details if found
-                                if accident_details_list:
-                                    vehicle_data['Accident Details'] = ' | '.join(
-                                        accident_details_list[:3])  # First 3 accidents
-
-                                # Set owner info
-                                vehicle_data['Number of Owners'] = owner_count if owner_count > 0 else 0
-                                vehicle_data['First Owner Date'] = first_date
-
-                                print(f" ✅ {len(history_rows)} records", flush=True)
-
-                            # Also check accident section for more details
-                            if vehicle_data['Accident Details'] == 'N/A':
-                                try:
-                                    accident_section = carfax_page.query_selector('#accident-damage-section')
-                                    if accident_section:
-                                        accident_rows = accident_section.query_selector_all(
-                                            '.mobile-table-row, tbody tr')
-                                        accident_info_list = []
-                                        for acc_row in accident_rows[:3]:  # Max 3
-                                            acc_text = acc_row.inner_text().strip()
-                                            if acc_text and len(acc_text) > 10:
-                                                # Clean up and shorten
-                                                acc_text = acc_text.replace('\n', ' ')[:150]
-                                                accident_info_list.append(acc_text)
-
-                                        if accident_info_list:
-                                            vehicle_data['Accident Details'] = ' | '.join(accident_info_list)
-                                except:
-                                    pass
-
-                        except Exception as e:
-                            print(f" ⚠️  Error: {str(e)[:30]}", flush=True)
-
-                        finally:
-                            if carfax_page:
-                                carfax_page.close()
-
-                    all_vehicles.append(vehicle_data)
-                    print(f"              ✅ Complete\n")
-
-                    time.sleep(0.8)
 
-                except Exception as e:
-                    print(f"[{idx}/{total_vehicles}] ❌ Fatal: {str(e)[:60]}\n")
-                    continue
+def build_dataframes(all_vehicles, all_carfax_history):
+    """Vehicles / history DataFrames with N/A for missing values, vehicles in COLUMN_ORDER."""
+    import pandas as pd
 
-        except Exception as e:
-            print(f"\n❌ Main error: {str(e)}")
+    # Create DataFrame
+    df_vehicles = pd.DataFrame(all_vehicles)
 
-        finally:
-            browser.close()
-
-        elapsed = time.time() - start_time
-        mins = int(elapsed // 60)
-        secs = int(elapsed % 60)
-
-        # ========================================
-        # EXPORT WITH N/A FOR ALL MISSING FIELDS
-        # ========================================
-
-        if all_vehicles:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-
-            print("\n" + "=" * 80)
-            print("💾 EXPORTING DATA")
-            print("=" * 80 + "\n")
-
-            # Column order
-            column_order = [
-                'Vehicle ID', 'Year', 'Make', 'Model', 'Title', 'VIN', 'Stock Number',
-                'Condition', 'Original Price', 'Sale Price', 'Special Price', 'Weekly Payment',
-                'Odometer', 'Body Style', 'Engine', 'Engine Size', 'Transmission', 'Drivetrain',
-                'Fuel Type', 'City Fuel Economy', 'Highway Fuel Economy',
-                'Exterior Color', 'Interior Color', 'Doors', 'Passengers',
-                'Description', 'Number of Photos', 'Image Count',
-                'Main Image URL', 'All Image URLs',
-                'Detail Page URL', 'Contact Us URL',
-                'Carfax Report URL', 'Carfax VIN', 'Carfax Report Number', 'Carfax Report Date',
-                'Carfax Last Odometer', 'Carfax Country of Assembly',
-                'Total History Records', 'Accident Summary', 'Accident Details',
-                'Service Records Count', 'Service Records Summary',
-                'Registration Summary', 'Number of Owners', 'First Owner Date',
-                'Open Recalls', 'Stolen Status', 'US History',
-                'Dealer Phone', 'Dealer Address'
+    # FIXED - Clean all missing data
+    for col in df_vehicles.columns:
+        df_vehicles[col] = df_vehicles[col].fillna('N/A')
+        # Use apply instead of replace for None
+        df_vehicles[col] = df_vehicles[col].apply(
+            lambda x: 'N/A' if (x == '' or x is None or (isinstance(x, float) and pd.isna(x))) else x
+        )
+
+    # Reorder
+    existing_cols = [c for c in COLUMN_ORDER if c in df_vehicles.columns]
+    df_vehicles = df_vehicles[existing_cols]
+
+    df_history = pd.DataFrame(all_carfax_history) if all_carfax_history else None
+    if df_history is not None and not df_history.empty:
+        for col in df_history.columns:
+            df_history[col] = df_history[col].fillna('N/A')
+            df_history[col] = df_history[col].apply(
+                lambda x: 'N/A' if (x == '' or x is None) else x
+            )
+
+    return df_vehicles, df_history
+
+
+def write_excel(df_vehicles, df_history, all_vehicles, all_carfax_history, excel_file):
+    """Vehicles, Carfax History and README sheets with number formats, widths and banding."""
+    import pandas as pd
+    from openpyxl import load_workbook
+    from openpyxl.styles import Font, PatternFill, Alignment
+    from openpyxl.utils import get_column_letter
+
+    with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
+        df_vehicles.to_excel(writer, index=False, sheet_name='Vehicles')
+        if df_history is not None and not df_history.empty:
+            df_history.to_excel(writer, index=False, sheet_name='Carfax History')
+
+        readme_data = {
+            'Sheet': ['Vehicles', 'Carfax History'],
+            'Rows': [len(all_vehicles), len(all_carfax_history) if all_carfax_history else 0],
+            'Description': [
+                'Main inventory - one row per vehicle',
+                'Detailed Carfax timeline - multiple rows per vehicle'
             ]
+        }
+        pd.DataFrame(readme_data).to_excel(writer, index=False, sheet_name='README')
+
+    # Format Excel
+    wb = load_workbook(excel_file)
+
+    number_columns = {
+        'Vehicle ID', 'Year', 'Original Price', 'Sale Price', 'Weekly Payment',
+        'Odometer', 'Doors', 'Passengers', 'Number of Photos', 'Image Count',
+        'Carfax Last Odometer', 'Service Records Count', 'Total History Records', 'Number of Owners'
+    }
+
+    text_columns = {'VIN', 'Stock Number', 'Dealer Phone', 'Carfax VIN', 'Carfax Report Number'}
+
+    for sheet_name in ['Vehicles', 'Carfax History']:
+        if sheet_name in wb.sheetnames:
+            ws = wb[sheet_name]
+
+            # Header
+            for cell in ws[1]:
+                cell.fill = PatternFill(start_color='1F4E78', end_color='1F4E78', fill_type='solid')
+                cell.font = Font(bold=True, color='FFFFFF', size=11)
+                cell.alignment = Alignment(horizontal='center', vertical='center')
+
+            ws.row_dimensions[1].height = 25
+
+            # Get headers
+            header_row = [cell.value for cell in ws[1]]
+
+            # Format columns
+            for col_idx, col_name in enumerate(header_row, start=1):
+                col_letter = get_column_letter(col_idx)
+
+                if col_name in number_columns:
+                    for row_idx in range(2, ws.max_row + 1):
+                        cell = ws[f'{col_letter}{row_idx}']
+                        # Only format if it's actually a number
+                        if cell.value not in ['N/A', None, '']:
+                            if col_name in ['Original Price', 'Sale Price']:
+                                cell.number_format = '$#,##0'
+                            elif col_name in ['Weekly Payment']:
+                                cell.number_format = '$#,##0.00'
+                            elif col_name in ['Odometer', 'Carfax Last Odometer']:
+                                cell.number_format = '#,##0'
+                            else:
+                                cell.number_format = '0'
+
+                elif col_name in text_columns:
+                    for row_idx in range(2, ws.max_row + 1):
+                        cell = ws[f'{col_letter}{row_idx}']
+                        cell.number_format = '@'
+
+            # Auto-width
+            for column in ws.columns:
+                max_length = 0
+                column_letter = get_column_letter(column[0].column)
+                for cell in column:
+                    try:
+                        if cell.value:
+                            max_length = max(max_length, len(str(cell.value)))
+                    except:
+                        pass
+                adjusted_width = min(max_length + 2, 60)
+                ws.column_dimensions[column_letter].width = adjusted_width
 
-            # Create DataFrame
-            df_vehicles = pd.DataFrame(all_vehicles)
+            ws.freeze_panes = 'A2'
+            ws.auto_filter.ref = ws.dimensions
 
-            # FIXED - Clean all missing data
-            for col in df_vehicles.columns:
-                df_vehicles[col] = df_vehicles[col].fillna('N/A')
-                # Use apply instead of replace for None
-                df_vehicles[col] = df_vehicles[col].apply(
-                    lambda x: 'N/A' if (x == '' or x is None or (isinstance(x, float) and pd.isna(x))) else x
-                )
+            # Alternating rows
+            light_gray = PatternFill(start_color='F2F2F2', end_color='F2F2F2', fill_type='solid')
+            for row_idx in range(3, ws.max_row + 1, 2):
+                for cell in ws[row_idx]:
+                    if not cell.fill or cell.fill.start_color.rgb != '1F4E78':
+                        cell.fill = light_gray
 
-            # Reorder
-            existing_cols = [c for c in column_order if c in df_vehicles.columns]
-            df_vehicles = df_vehicles[existing_cols]
+    wb.save(excel_file)
+    print(f"✅ Excel: {excel_file}")
+    print(f"   ✓ All missing fields filled with 'N/A'")
+    print(f"   ✓ Professional formatting applied")
 
-            df_history = pd.DataFrame(all_carfax_history) if all_carfax_history else None
-            if df_history is not None and not df_history.empty:
-                for col in df_history.columns:
-                    df_history[col] = df_history[col].fillna('N/A')
-                    df_history[col] = df_history[col].apply(
-                        lambda x: 'N/A' if (x == '' or x is None) else x
-                    )
 
+def export_results(all_vehicles, all_carfax_history, total_vehicles, mins, secs, extra_metadata=None,
+                   formats=DEFAULT_FORMATS, output_dir='.'):
+    """
+    Requested formats (json / csv / xlsx / fts) into output_dir, then a data quality report.
+    mins / secs is the scrape time; None for a re-export of a stored run, which reports its own time.
+    pandas and openpyxl are only imported for csv / xlsx.
+    fts adds the run to the search index in output_dir (skipped if already indexed).
+    Returns {format: file written}.
+    """
+    # ========================================
+    # EXPORT WITH N/A FOR ALL MISSING FIELDS
+    # ========================================
+
+    written = {}
+    export_start = time.time()
+
+    if all_vehicles:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        os.makedirs(output_dir, exist_ok=True)
 
-            # JSON
-            json_file = f'CurveMotors_{timestamp}.json'
+        metadata = {
+            'scraped_at': datetime.now().isoformat(),
+            'total_vehicles': len(all_vehicles),
+            'scrape_time_minutes': mins,
+            **(extra_metadata or {})
+        }
+
+        print("\n" + "=" * 80)
+        print("💾 EXPORTING DATA")
+        print("=" * 80 + "\n")
+
+        if 'csv' in formats or 'xlsx' in formats:
+            df_vehicles, df_history = build_dataframes(all_vehicles, all_carfax_history)
+
+        if 'json' in formats:
+            json_file = os.path.join(output_dir, f'CurveMotors_{timestamp}.json')
             with open(json_file, 'w', encoding='utf-8') as f:
                 json.dump({
                     'vehicles': all_vehicles,
                     'carfax_history': all_carfax_history,
-                    'metadata': {
-                        'scraped_at': datetime.now().isoformat(),
-                        'total_vehicles': len(all_vehicles),
-                        'scrape_time_minutes': mins
-                    }
+                    'metadata': metadata
                 }, f, indent=2, ensure_ascii=False)
             print(f"✅ JSON: {json_file}")
+            written['json'] = json_file
 
-            # CSV
-            csv_file = f'CurveMotors_Vehicles_{timestamp}.csv'
+        if 'csv' in formats:
+            csv_file = os.path.join(output_dir, f'CurveMotors_Vehicles_{timestamp}.csv')
             df_vehicles.to_csv(csv_file, index=False, encoding='utf-8-sig')
             print(f"✅ CSV: {csv_file}")
+            written['csv'] = csv_file
 
             if df_history is not None and not df_history.empty:
-                history_csv = f'CurveMotors_History_{timestamp}.csv'
+                history_csv = os.path.join(output_dir, f'CurveMotors_History_{timestamp}.csv')
                 df_history.to_csv(history_csv, index=False, encoding='utf-8-sig')
                 print(f"✅ History CSV: {history_csv}")
+                written['history_csv'] = history_csv
+
+        if 'xlsx' in formats:
+            excel_file = os.path.join(output_dir, f'CurveMotors_{timestamp}.xlsx')
+            write_excel(df_vehicles, df_history, all_vehicles, all_carfax_history, excel_file)
+            written['xlsx'] = excel_file
+
+        if 'fts' in formats:
+            db_file = os.path.join(output_dir, search_index.DEFAULT_DB)
+            conn = search_index.connect(db_file)
+            try:
+                added = search_index.index_run(conn, metadata['scraped_at'], all_vehicles, all_carfax_history,
+                                               source=written.get('json'))
+            finally:
+                conn.close()
+            print(f"✅ Search index: {db_file}" + ("" if added else " (run already indexed)"))
+            written['fts'] = db_file
+
+        # DATA QUALITY REPORT
+        print("\n" + "=" * 80)
+        print("📊 DATA QUALITY REPORT")
+        print("=" * 80)
 
-            # EXCEL
-            excel_file = f'CurveMotors_{timestamp}.xlsx'
-
-            with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
-                df_vehicles.to_excel(writer, index=False, sheet_name='Vehicles')
-                if df_history is not None and not df_history.empty:
-                    df_history.to_excel(writer, index=False, sheet_name='Carfax History')
-
-                readme_data = {
-                    'Sheet': ['Vehicles', 'Carfax History'],
-                    'Rows': [len(all_vehicles), len(all_carfax_history) if all_carfax_history else 0],
-                    'Description': [
-                        'Main inventory - one row per vehicle',
-                        'Detailed Carfax timeline - multiple rows per vehicle'
-                    ]
-                }
-                pd.DataFrame(readme_data).to_excel(writer, index=False, sheet_name='README')
-
-            # Format Excel
-            wb = load_workbook(excel_file)
-
-            number_columns = {
-                'Vehicle ID', 'Year', 'Original Price', 'Sale Price', 'Weekly Payment',
-                'Odometer', 'Doors', 'Passengers', 'Number of Photos', 'Image Count',
-                'Carfax Last Odometer', 'Service Records Count', 'Total History Records', 'Number of Owners'
-            }
-
-            text_columns = {'VIN', 'Stock Number', 'Dealer Phone', 'Carfax VIN', 'Carfax Report Number'}
-
-            for sheet_name in ['Vehicles', 'Carfax History']:
-                if sheet_name in wb.sheetnames:
-                    ws = wb[sheet_name]
-
-                    # Header
-                    for cell in ws[1]:
-                        cell.fill = PatternFill(start_color='1F4E78', end_color='1F4E78', fill_type='solid')
-                        cell.font = Font(bold=True, color='FFFFFF', size=11)
-                        cell.alignment = Alignment(horizontal='center', vertical='center')
-
-                    ws.row_dimensions[1].height = 25
-
-                    # Get headers
-                    header_row = [cell.value for cell in ws[1]]
-
-                    # Format columns
-                    for col_idx, col_name in enumerate(header_row, start=1):
-                        col_letter = get_column_letter(col_idx)
-
-                        if col_name in number_columns:
-                            for row_idx in range(2, ws.max_row + 1):
-                                cell = ws[f'{col_letter}{row_idx}']
-                                # Only format if it's actually a number
-                                if cell.value not in ['N/A', None, '']:
-                                    if col_name in ['Original Price', 'Sale Price']:
-                                        cell.number_format = '$#,##0'
-                                    elif col_name in ['Weekly Payment']:
-                                        cell.number_format = '$#,##0.00'
-                                    elif col_name in ['Odometer', 'Carfax Last Odometer']:
-                                        cell.number_format = '#,##0'
-                                    else:
-                                        cell.number_format = '0'
-
-                        elif col_name in text_columns:
-                            for row_idx in range(2, ws.max_row + 1):
-                                cell = ws[f'{col_letter}{row_idx}']
-                                cell.number_format = '@'
-
-                    # Auto-width
-                    for column in ws.columns:
-                        max_length = 0
-                        column_letter = get_column_letter(column[0].column)
-                        for cell in column:
-                            try:
-                                if cell.value:
-                                    max_length = max(max_length, len(str(cell.value)))
-                            except:
-                                pass
-                        adjusted_width = min(max_length + 2, 60)
-                        ws.column_dimensions[column_letter].width = adjusted_width
-
-                    ws.freeze_panes = 'A2'
-                    ws.auto_filter.ref = ws.dimensions
-
-                    # Alternating rows
-                    light_gray = PatternFill(start_color='F2F2F2', end_color='F2F2F2', fill_type='solid')
-                    for row_idx in range(3, ws.max_row + 1, 2):
-                        for cell in ws[row_idx]:
-                            if not cell.fill or cell.fill.start_color.rgb != '1F4E78':
-                                cell.fill = light_gray
-
-            wb.save(excel_file)
-            print(f"✅ Excel: {excel_file}")
-            print(f"   ✓ All missing fields filled with 'N/A'")
-            print(f"   ✓ Professional formatting applied")
-
-            # DATA QUALITY REPORT
-            print("\n" + "=" * 80)
-            print("📊 DATA QUALITY REPORT")
-            print("=" * 80)
+        critical_fields = ['Title', 'Year', 'Make', 'Model', 'Sale Price', 'Dealer Phone', 'Description',
+                           'Accident Details', 'Service Records Count', 'Number of Owners', 'Total History Records']
 
-            critical_fields = ['Title', 'Year', 'Make', 'Model', 'Sale Price', 'Dealer Phone', 'Description',
-                               'Accident Details', 'Service Records Count', 'Number of Owners', 'Total History Records']
+        for field in critical_fields:
+            values = [v.get(field) for v in all_vehicles]
+            if all(value is None for value in values):
+                continue
 
-            for field in critical_fields:
-                if field in df_vehicles.columns:
-                    # Count non-N/A values
-                    if field in ['Service Records Count', 'Number of Owners', 'Total History Records']:
-                        filled = len(df_vehicles[df_vehicles[field] > 0])
-                    else:
-                        filled = len(df_vehicles[df_vehicles[field] != 'N/A'])
+            # Count non-N/A values
+            if field in ['Service Records Count', 'Number of Owners', 'Total History Records']:
+                filled = sum(1 for value in values if isinstance(value, (int, float)) and value > 0)
+            else:
+                filled = sum(1 for value in values if value not in ('N/A', '', None))
 
-                    total = len(df_vehicles)
-                    pct = (filled / total * 100) if total > 0 else 0
-                    status = "✅" if pct >= 50 else ("⚠️" if pct >= 20 else "ℹ️")
-                    print(f"{status} {field}: {filled}/{total} ({pct:.1f}%)")
+            total = len(all_vehicles)
+            pct = (filled / total * 100) if total > 0 else 0
+            status = "✅" if pct >= 50 else ("⚠️" if pct >= 20 else "ℹ️")
+            print(f"{status} {field}: {filled}/{total} ({pct:.1f}%)")
 
+        if mins is None:
+            print(f"\n⏰ Export time: {time.time() - export_start:.1f}s")
+        else:
             print(f"\n⏰ Time: {mins}m {secs}s")
-            print(f"🚗 Vehicles: {len(all_vehicles)}/{total_vehicles}")
-            print(f"📜 History records: {len(all_carfax_history)}")
-            print("=" * 80)
+        print(f"🚗 Vehicles: {len(all_vehicles)}/{total_vehicles}")
+        print(f"📜 History records: {len(all_carfax_history)}")
+        print("=" * 80)
+        if mins is None:
+            print("\n🎉 EXPORT COMPLETE")
+        else:
             print("\n🎉 SCRAPING COMPLETE - ALL FIELDS POPULATED!")
-            print("=" * 80)
+        print("=" * 80)
+
+    return written
+
+
+# ========================================
+# CLI
+# ========================================
+
+COMMANDS = ('scrape', 'export', 'parse-only', 'index', 'search', 'watch')
+
+
+def parse_formats(value):
+    """argparse type for --formats: comma separated subset of EXPORT_FORMATS."""
+    formats = tuple(f.strip().lower() for f in value.split(',') if f.strip())
+    unknown = [f for f in formats if f not in EXPORT_FORMATS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(f"choose from {', '.join(EXPORT_FORMATS)} (got {value!r})")
+    return formats
+
+
+def positive_int(value):
+    """argparse type for --limit: 0 or less would silently mean "no limit"."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1 (got {value})")
+    return number
+
+
+def existing_file(path):
+    """argparse type for input files, so a missing one is a usage error."""
+    if not os.path.isfile(path):
+        raise argparse.ArgumentTypeError(f"no such file: {path}")
+    return path
+
 
-        return all_vehicles, all_carfax_history
+def load_run(json_file):
+    """(vehicles, carfax_history, metadata) of a stored CurveMotors_*.json run."""
+    with open(json_file, encoding='utf-8') as f:
+        data = json.load(f)
+    return data.get('vehicles', []), data.get('carfax_history', []), data.get('metadata', {})
+
+
+def cmd_scrape(args):
+    scrape_curve_motors_perfect(images_dir=args.images_dir, headless=args.headless, limit=args.limit,
+                                formats=args.formats, output_dir=args.output_dir, profile_dir=args.profile_dir,
+                                slow_seconds=args.slow_seconds, python_profiler=args.profiler,
+                                record_har=args.record, replay_har=args.replay, pause_scale=args.pause_scale)
+
+
+def cmd_export(args):
+    vehicles, history, metadata = load_run(args.json_file)
+    if args.limit is not None:
+        vehicles = vehicles[:args.limit]
+        kept_ids = {v.get('Vehicle ID') for v in vehicles}
+        history = [h for h in history if h.get('Vehicle ID') in kept_ids]
+
+    # Keep scraped_at of a complete run, so it is indexed as that run
+    # A partial copy would be indexed as a new run and become the latest one
+    formats = args.formats
+    if args.limit is not None and 'fts' in formats:
+        print("⚠️  Skipping fts for a --limit export - index the full run with 'index'")
+        formats = tuple(f for f in formats if f != 'fts')
+        if not formats:
+            return
+
+    # scrape_time_minutes stays the source run's, the report prints the export's own time
+    dropped = ('total_vehicles',) + (('scraped_at',) if args.limit is not None else ())
+    extra_metadata = {k: v for k, v in metadata.items() if k not in dropped}
+    extra_metadata['exported_from'] = args.json_file
+
+    export_results(vehicles, history, len(vehicles), None, None, extra_metadata,
+                   formats=formats, output_dir=args.output_dir)
+
+
+def cmd_parse_only(args):
+    titles = [(None, title) for title in args.title or []]
+    for json_file in args.json_files:
+        vehicles, _, _ = load_run(json_file)
+        titles.extend((v.get('Vehicle ID'), v.get('Title') or 'N/A') for v in vehicles)
+    if args.json_files:
+        seed_from_runs(args.json_files)
+    else:
+        seed_from_dir()
+
+    if args.limit is not None:
+        titles = titles[:args.limit]
+
+    for vehicle_id, title in titles:
+        year, make, model = parse_title(title)
+        if args.json:
+            print(json.dumps({'Vehicle ID': vehicle_id, 'Title': title, 'Year': year, 'Make': make,
+                              'Model': model}, ensure_ascii=False))
+        else:
+            print(f"{vehicle_id or '-':>8}  {year} | {make} | {model}")
+
+
+def cmd_index(args):
+    conn = search_index.connect(args.db)
+    try:
+        for json_file in args.json_files:
+            vehicles, history, metadata = load_run(json_file)
+            run_id = metadata.get('scraped_at') or os.path.basename(json_file)
+            added = search_index.index_run(conn, run_id, vehicles, history, source=json_file, reindex=args.reindex)
+            print(f"{'✅' if added else '⏭️ '} {json_file}: {len(vehicles)} vehicles, {len(history)} history rows"
+                  + ("" if added else " (already indexed)"))
+        print(f"📚 {len(search_index.indexed_runs(conn))} runs in {args.db}")
+    finally:
+        conn.close()
+
+
+def cmd_search(args):
+    search_index.run_search(args.db, ' '.join(args.query), history=args.history, latest_only=args.latest,
+                            limit=args.limit)
+
+
+def cmd_watch(args):
+    from watch import watch
+
+    watch(interval=args.interval, feed_file=args.feed, state_file=args.state, webhook_url=args.webhook,
+          enrich=not args.no_enrich, headless=args.headless, max_polls=args.max_polls)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Curve Motors inventory + Carfax scraper')
+    subparsers = parser.add_subparsers(dest='command')
+
+    output_options = argparse.ArgumentParser(add_help=False)
+    output_options.add_argument('--formats', type=parse_formats, default=DEFAULT_FORMATS,
+                                help='comma separated: json,csv,xlsx,fts (default: json,csv,xlsx)')
+    output_options.add_argument('--output-dir', default='.', help='where export files are written')
+    output_options.add_argument('--limit', type=positive_int, help='only the first N vehicles')
+
+    scrape = subparsers.add_parser('scrape', parents=[output_options], help='full scrape + export (default)')
+    scrape.add_argument('--headless', action='store_true', help='run Chromium without a window')
+    scrape.add_argument('--images-dir', help='download images there and flag reused photos')
+    scrape.add_argument('--profile-dir', help='write Python profile, memory phases, slow-page traces and run_report.json')
+    scrape.add_argument('--slow-seconds', type=float, default=30,
+                        help='keep the Playwright trace of vehicles slower than this (default: 30)')
+    scrape.add_argument('--profiler', choices=('cprofile', 'pyinstrument'), default='cprofile')
+    network = scrape.add_mutually_exclusive_group()
+    network.add_argument('--record', metavar='HAR', help='save all network responses (e.g. runs/net.har.zip)')
+    network.add_argument('--replay', metavar='HAR', type=existing_file, help='run offline from a recorded HAR')
+    scrape.add_argument('--pause-scale', type=float,
+                        help=f'multiply the detail / Carfax page waits (default: 1, {REPLAY_PAUSE_SCALE} with --replay)')
+    scrape.set_defaults(func=cmd_scrape)
+
+    export = subparsers.add_parser('export', parents=[output_options], help='re-export a stored JSON run')
+    export.add_argument('json_file')
+    export.set_defaults(func=cmd_export)
+
+    parse_only = subparsers.add_parser('parse-only', help='Year/Make/Model from titles, no browser')
+    parse_only.add_argument('json_files', nargs='*', help='stored JSON runs')
+    parse_only.add_argument('--title', action='append', help='a title to parse (repeatable)')
+    parse_only.add_argument('--limit', type=positive_int)
+    parse_only.add_argument('--json', action='store_true', help='one JSON object per line')
+    parse_only.set_defaults(func=cmd_parse_only)
+
+    index = subparsers.add_parser('index', help='add stored JSON runs to the full-text search index')
+    index.add_argument('json_files', nargs='+')
+    index.add_argument('--db', default=search_index.DEFAULT_DB)
+    index.add_argument('--reindex', action='store_true', help='replace runs that are already indexed')
+    index.set_defaults(func=cmd_index)
+
+    search = subparsers.add_parser('search', help='full-text search over all indexed runs')
+    search.add_argument('query', nargs='+', help='FTS5 query, e.g. body_style:van collision ontario')
+    search.add_argument('--db', default=search_index.DEFAULT_DB)
+    search.add_argument('--history', action='store_true', help='match individual Carfax history rows')
+    search.add_argument('--latest', action='store_true', help='only the most recently indexed run')
+    search.add_argument('--limit', type=positive_int, default=20)
+    search.set_defaults(func=cmd_search)
+
+    watch = subparsers.add_parser('watch', help='poll the listing and emit added/removed/changed events')
+    watch.add_argument('--interval', type=int, default=300, help='seconds between polls')
+    watch.add_argument('--feed', default='CurveMotors_Events.jsonl')
+    watch.add_argument('--state', default='CurveMotors_WatchState.json')
+    watch.add_argument('--webhook', help='URL to POST each event to')
+    watch.add_argument('--no-enrich', action='store_true', help='skip detail page / Carfax for changes')
+    watch.add_argument('--headed', dest='headless', action='store_false', help='show the browser window')
+    watch.add_argument('--max-polls', type=int)
+    watch.set_defaults(func=cmd_watch)
+
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # No subcommand: same full scrape as before the CLI existed
+    if not argv or argv[0] not in COMMANDS + ('-h', '--help'):
+        argv = ['scrape'] + argv
+
+    args = build_parser().parse_args(argv)
+    args.func(args)
 
 
 if __name__ == "__main__":
-    vehicles, history = scrape_curve_motors_perfect()
\ No newline at end of file
+    main()
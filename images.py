@@ -0,0 +1,269 @@
+"""
+Optional image stage
+
+- Ordered, de-duplicated image URL list per vehicle
+- Concurrent downloads over one pooled HTTP session (requests)
+- Content-addressed store: images/<sha[:2]>/<sha><ext>, URLs already stored are skipped
+  unless a HEAD request shows their ETag / Last-Modified changed (photo replaced at the same URL)
+- Perceptual hash (dHash, needs Pillow) to spot stock photos reused across vehicles
+
+Run on a stored run:  python images.py CurveMotors_20251029_121726.json --out images
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+
+MANIFEST_NAME = 'manifest.json'
+
+# Response headers stored per URL and compared by HEAD on later runs
+VALIDATORS = {'etag': 'ETag', 'last_modified': 'Last-Modified'}
+
+
+def collect_image_urls(srcs):
+    """Full-size URLs in page order, without logos/icons or duplicates."""
+    image_urls = {}
+    for src in srcs:
+        if src and 'logo' not in src.lower() and 'icon' not in src.lower():
+            image_urls.setdefault(src.replace('thumb-', ''), None)
+    return list(image_urls)
+
+
+def vehicle_image_urls(vehicle):
+    """Image URL list of a vehicle dict, also for runs stored before 'Image URLs' existed."""
+    urls = vehicle.get('Image URLs')
+    if isinstance(urls, list):
+        return urls
+    joined = vehicle.get('All Image URLs') or 'N/A'
+    return [] if joined == 'N/A' else [u.strip() for u in joined.split(',') if u.strip()]
+
+
+def load_manifest(store_dir):
+    path = os.path.join(store_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(store_dir, manifest):
+    path = os.path.join(store_dir, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def perceptual_hash(path, hash_size=8):
+    """
+    64-bit difference hash as hex, or None when Pillow is not installed
+    or the file is not an image.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+
+    try:
+        with Image.open(path) as img:
+            small = img.convert('L').resize((hash_size + 1, hash_size))
+    except Exception:
+        return None
+
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f'{bits:0{hash_size * hash_size // 4}x}'
+
+
+def _store_path(store_dir, sha, url):
+    ext = os.path.splitext(urlparse(url).path)[1].lower() or '.jpg'
+    return os.path.join(store_dir, sha[:2], sha + ext)
+
+
+def _fetch(session, url, store_dir, timeout):
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    content = response.content
+
+    sha = hashlib.sha256(content).hexdigest()
+    path = _store_path(store_dir, sha, url)
+    if not os.path.exists(path):
+        # Unique tmp file per call: two URLs with identical bytes share one target
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            if not os.path.exists(path):
+                raise
+
+    return {
+        'sha256': sha,
+        'path': os.path.relpath(path, store_dir),
+        'bytes': len(content),
+        'phash': perceptual_hash(path),
+        **{key: response.headers.get(header) for key, header in VALIDATORS.items()},
+    }
+
+
+def _revalidate(session, url, entry, timeout):
+    """
+    HEAD a stored URL: True if its ETag / Last-Modified differ from the download.
+    Entries stored without validators get the current ones and count as unchanged.
+    """
+    response = session.head(url, timeout=timeout, allow_redirects=True)
+    if response.status_code >= 400:
+        return False  # keep the stored copy
+
+    current = {key: response.headers.get(header) for key, header in VALIDATORS.items()}
+    if not any(entry.get(key) for key in VALIDATORS):
+        entry.update(current)
+        return False
+    return any(entry.get(key) and current[key] and entry[key] != current[key] for key in VALIDATORS)
+
+
+def download_images(vehicles, store_dir='images', workers=8, timeout=30, revalidate=True):
+    """
+    Download every vehicle image not already in the store; with revalidate,
+    stored URLs are HEAD-checked and fetched again when they changed.
+    Returns the manifest: url -> {sha256, path, bytes, phash, etag, last_modified}.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = load_manifest(store_dir)
+
+    all_urls = {}
+    for vehicle in vehicles:
+        for url in vehicle_image_urls(vehicle):
+            all_urls.setdefault(url, None)
+
+    stored = {
+        url for url in all_urls
+        if url in manifest and os.path.exists(os.path.join(store_dir, manifest[url]['path']))
+    }
+    pending = [url for url in all_urls if url not in stored]
+
+    # Stored before Pillow was installed: hash the file already on disk
+    for url in stored:
+        if manifest[url].get('phash') is None:
+            manifest[url]['phash'] = perceptual_hash(os.path.join(store_dir, manifest[url]['path']))
+
+    print(f"🖼️  Images: {len(all_urls)} total, {len(stored)} cached, {len(pending)} new")
+
+    start_time = time.time()
+    failed = 0
+
+    with requests.Session() as session:
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=2)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            if revalidate and stored:
+                futures = {executor.submit(_revalidate, session, url, manifest[url], timeout): url
+                           for url in all_urls if url in stored}
+                changed = set()
+                for future in as_completed(futures):
+                    try:
+                        if future.result():
+                            changed.add(futures[future])
+                    except Exception as e:
+                        print(f"   ⚠️  HEAD {futures[future].split('/')[-1][:40]}: {str(e)[:50]}")
+                print(f"   🔄 {len(changed)} cached images changed at the source")
+                pending.extend(url for url in all_urls if url in changed)
+
+            futures = {executor.submit(_fetch, session, url, store_dir, timeout): url for url in pending}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    manifest[url] = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"   ⚠️  {url.split('/')[-1][:40]}: {str(e)[:50]}")
+
+    save_manifest(store_dir, manifest)
+    print(f"   ✅ {len(pending) - failed} downloaded, {failed} failed ({time.time() - start_time:.1f}s)")
+    return manifest
+
+
+def _hamming(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count('1')
+
+
+def find_reused_photos(vehicles, manifest, max_distance=4):
+    """
+    Groups of near-identical photos (dHash distance <= max_distance)
+    that appear on more than one vehicle - typically stock photos.
+    """
+    by_hash = {}
+    for vehicle in vehicles:
+        if not vehicle.get('Vehicle ID'):
+            continue
+        for url in vehicle_image_urls(vehicle):
+            phash = (manifest.get(url) or {}).get('phash')
+            if phash:
+                entry = by_hash.setdefault(phash, {'vehicle_ids': set(), 'urls': set()})
+                entry['vehicle_ids'].add(str(vehicle['Vehicle ID']))
+                entry['urls'].add(url)
+
+    # Cluster hashes within max_distance of a cluster's first hash
+    clusters = []
+    for phash in sorted(by_hash):
+        for cluster in clusters:
+            if _hamming(cluster['phash'], phash) <= max_distance:
+                cluster['vehicle_ids'] |= by_hash[phash]['vehicle_ids']
+                cluster['urls'] |= by_hash[phash]['urls']
+                break
+        else:
+            clusters.append({
+                'phash': phash,
+                'vehicle_ids': set(by_hash[phash]['vehicle_ids']),
+                'urls': set(by_hash[phash]['urls']),
+            })
+
+    return [
+        {'phash': c['phash'], 'vehicle_ids': sorted(c['vehicle_ids']), 'urls': sorted(c['urls'])}
+        for c in clusters if len(c['vehicle_ids']) > 1
+    ]
+
+
+def run_image_stage(vehicles, store_dir='images', workers=8, revalidate=True):
+    """Download, then report photos shared between vehicles."""
+    manifest = download_images(vehicles, store_dir=store_dir, workers=workers, revalidate=revalidate)
+    reused = find_reused_photos(vehicles, manifest)
+    if reused:
+        print(f"   🔁 {len(reused)} photos reused across vehicles")
+        for group in reused[:10]:
+            print(f"      {group['phash']}: {', '.join(group['vehicle_ids'])}")
+    return manifest, reused
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Download and hash images of a stored run')
+    parser.add_argument('json_file')
+    parser.add_argument('--out', default='images', help='image store directory')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--no-revalidate', action='store_true', help='trust stored URLs without a HEAD request')
+    args = parser.parse_args()
+
+    with open(args.json_file, encoding='utf-8') as f:
+        stored_vehicles = json.load(f).get('vehicles', [])
+
+    run_image_stage(stored_vehicles, store_dir=args.out, workers=args.workers, revalidate=not args.no_revalidate)
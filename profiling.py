@@ -0,0 +1,228 @@
+"""
+Opt-in run profiling
+
+- cProfile (or pyinstrument if installed) around the Python side
+- tracemalloc snapshot at each checkpoint, diffed against the previous one
+- Playwright trace per vehicle, kept only when it is slow or failed
+- run_report.json linking every kept artifact to its Vehicle ID
+
+Disabled (profile_dir=None) every method is a no-op, so the scraper calls it unconditionally.
+"""
+import json
+import os
+import time
+import traceback
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+
+REPORT_NAME = 'run_report.json'
+
+
+def _format_error(error):
+    if isinstance(error, BaseException):
+        return ''.join(traceback.format_exception(type(error), error, error.__traceback__)).strip()
+    return str(error)
+
+
+class RunProfiler:
+
+    def __init__(self, profile_dir=None, slow_seconds=30, python_profiler='cprofile'):
+        self.enabled = bool(profile_dir)
+        self.profile_dir = profile_dir
+        self.slow_seconds = slow_seconds
+        self.python_profiler = python_profiler
+
+        self.context = None
+        self.phases = []
+        self.vehicles = []
+        self.artifacts = {}
+        self._profiler = None
+        self._started = None
+        self._last_checkpoint = None
+        self._last_snapshot = None
+
+    # ========================================
+    # RUN
+    # ========================================
+
+    def start(self):
+        if not self.enabled:
+            return
+
+        os.makedirs(os.path.join(self.profile_dir, 'traces'), exist_ok=True)
+        self._started = time.time()
+        self._last_checkpoint = self._started
+
+        if self.python_profiler == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+                self._profiler = Profiler()
+            except ImportError:
+                print("⚠️  pyinstrument not installed - using cProfile")
+                self.python_profiler = 'cprofile'
+
+        if self.python_profiler == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+
+        if self.python_profiler == 'pyinstrument':
+            self._profiler.start()
+        elif self._profiler:
+            self._profiler.enable()
+
+        tracemalloc.start()
+        self._last_snapshot = tracemalloc.take_snapshot()
+        print(f"🔬 Profiling to {self.profile_dir} (traces kept for > {self.slow_seconds}s or errors)")
+
+    def checkpoint(self, name):
+        """Close the phase that ends here: duration + allocations since the previous checkpoint."""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        top_stats = snapshot.compare_to(self._last_snapshot, 'lineno')[:10]
+
+        self.phases.append({
+            'name': name,
+            'seconds': round(now - self._last_checkpoint, 2),
+            'memory_current_mb': round(current / 1024 / 1024, 2),
+            'memory_peak_mb': round(peak / 1024 / 1024, 2),
+            'top_allocations': [str(stat) for stat in top_stats],
+        })
+
+        tracemalloc.reset_peak()
+        self._last_snapshot = snapshot
+        self._last_checkpoint = time.time()
+
+    def stop(self):
+        """
+        Stop profilers and write run_report.json. Returns the report path,
+        None if writing failed - it runs in the scraper's finally and must not
+        hide the scrape's own error.
+        """
+        if not self.enabled:
+            return None
+
+        if self._profiler and self.python_profiler == 'pyinstrument':
+            self._profiler.stop()
+        elif self._profiler:
+            self._profiler.disable()
+        tracemalloc.stop()
+
+        try:
+            return self._write_report()
+        except Exception as e:
+            print(f"⚠️  Run report not written: {str(e)[:50]}")
+            return None
+
+    def _write_report(self):
+        python_profile = None
+        if self._profiler and self.python_profiler == 'pyinstrument':
+            python_profile = 'python_profile.html'
+            with open(os.path.join(self.profile_dir, python_profile), 'w', encoding='utf-8') as f:
+                f.write(self._profiler.output_html())
+        elif self._profiler:
+            import pstats
+
+            python_profile = 'python.prof'
+            self._profiler.dump_stats(os.path.join(self.profile_dir, python_profile))
+            with open(os.path.join(self.profile_dir, 'python_profile.txt'), 'w', encoding='utf-8') as f:
+                pstats.Stats(self._profiler, stream=f).sort_stats('cumulative').print_stats(40)
+
+        report_file = os.path.join(self.profile_dir, REPORT_NAME)
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'total_seconds': round(time.time() - self._started, 2),
+                'slow_seconds': self.slow_seconds,
+                'python_profile': python_profile,
+                'phases': self.phases,
+                'artifacts': self.artifacts,
+                'vehicles': sorted(self.vehicles, key=lambda v: v['seconds'], reverse=True),
+            }, f, indent=2, ensure_ascii=False)
+
+        slow = [v for v in self.vehicles if v['slow']]
+        failed = [v for v in self.vehicles if v['failed']]
+        print(f"🔬 Run report: {report_file} ({len(slow)} slow, {len(failed)} failed, "
+              f"{len(self.artifacts)} traces kept)")
+        return report_file
+
+    # ========================================
+    # PLAYWRIGHT TRACING
+    # ========================================
+
+    def attach(self, context):
+        """Start tracing on the browser context; one chunk per vehicle follows."""
+        if not self.enabled:
+            return
+        try:
+            context.tracing.start(screenshots=True, snapshots=True)
+            self.context = context
+        except Exception as e:
+            print(f"⚠️  Tracing unavailable: {str(e)[:50]}")
+
+    def detach(self):
+        """Stop tracing - must run before the browser closes."""
+        if self.context:
+            try:
+                self.context.tracing.stop()
+            except Exception:
+                pass
+            self.context = None
+
+    @contextmanager
+    def vehicle(self, vehicle_id):
+        """
+        Time one vehicle and trace it. The caller may put errors it swallowed
+        into the yielded record ('*_error' keys); they count as failures.
+        """
+        record = {}
+        if not self.enabled:
+            yield record
+            return
+
+        if self.context:
+            try:
+                self.context.tracing.start_chunk(title=f'vehicle-{vehicle_id}')
+            except Exception as e:
+                # Profiling must not change what gets scraped: go on without traces
+                print(f"              ⚠️  Tracing stopped: {str(e)[:50]}")
+                self.context = None
+
+        start_time = time.time()
+        try:
+            yield record
+        except BaseException as e:
+            record['fatal_error'] = e
+            raise
+        finally:
+            seconds = time.time() - start_time
+            errors = {k: _format_error(v) for k, v in record.items() if k.endswith('_error') and v}
+            slow = seconds > self.slow_seconds
+            failed = bool(errors)
+
+            trace = None
+            if self.context:
+                try:
+                    if slow or failed:
+                        trace = os.path.join('traces', f'{vehicle_id}.zip')
+                        self.context.tracing.stop_chunk(path=os.path.join(self.profile_dir, trace))
+                        self.artifacts[vehicle_id] = trace
+                    else:
+                        self.context.tracing.stop_chunk()
+                except Exception as e:
+                    trace = None
+                    print(f"              ⚠️  Trace error: {str(e)[:50]}")
+
+            self.vehicles.append({
+                'Vehicle ID': vehicle_id,
+                'seconds': round(seconds, 2),
+                'slow': slow,
+                'failed': failed,
+                'errors': errors,
+                'trace': trace,
+            })
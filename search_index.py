@@ -0,0 +1,164 @@
+"""
+Full-text search over every run (SQLite FTS5)
+
+- vehicles_fts: one document per vehicle per run - title, make/model, body style,
+  description, accident fields and its whole Carfax history, so a query like
+  "van collision ontario" can match across them
+- history_fts: one document per Carfax history row (record type, source, details)
+- runs: which runs are indexed; a run already indexed is skipped (incremental)
+
+Query syntax is FTS5: words (AND), OR, "phrases", prefix*, column:word (e.g. body_style:van)
+"""
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+
+DEFAULT_DB = 'CurveMotors_Search.db'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    source TEXT,
+    vehicles INTEGER,
+    history_rows INTEGER,
+    indexed_at TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS vehicles_fts USING fts5(
+    run_id UNINDEXED, vehicle_id UNINDEXED, year UNINDEXED, sale_price UNINDEXED, url UNINDEXED,
+    title, make, model, body_style, description, accident_summary, accident_details, history,
+    tokenize = 'porter unicode61'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+    run_id UNINDEXED, vehicle_id UNINDEXED, date UNINDEXED, odometer UNINDEXED,
+    record_type, source, details,
+    tokenize = 'porter unicode61'
+);
+'''
+
+
+# Defaults scrape_carfax() sets before (or instead of) reading a report - not report text
+PLACEHOLDERS = frozenset({'N/A', 'No accidents reported', 'Not stolen'})
+
+
+def _text(value):
+    return '' if value is None or value in PLACEHOLDERS else str(value)
+
+
+def connect(db_path=DEFAULT_DB):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def index_run(conn, run_id, vehicles, carfax_history, source=None, reindex=False):
+    """
+    Add one run to the index. Returns False if it was already indexed
+    (and reindex is not set). Reindexing replaces the run in one transaction
+    and keeps its original indexed_at, so it does not become the latest run.
+    """
+    already_indexed = conn.execute('SELECT indexed_at FROM runs WHERE run_id = ?', (run_id,)).fetchone()
+    if already_indexed and not reindex:
+        return False
+    indexed_at = already_indexed['indexed_at'] if already_indexed else datetime.now().isoformat()
+
+    history_by_vehicle = {}
+    for row in carfax_history:
+        history_by_vehicle.setdefault(row.get('Vehicle ID'), []).append(row)
+
+    with conn:
+        if already_indexed:
+            for table in ('runs', 'vehicles_fts', 'history_fts'):
+                conn.execute(f'DELETE FROM {table} WHERE run_id = ?', (run_id,))
+        conn.executemany(
+            'INSERT INTO vehicles_fts (run_id, vehicle_id, year, sale_price, url, title, make, model, body_style, '
+            'description, accident_summary, accident_details, history) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [(
+                run_id, v.get('Vehicle ID'), _text(v.get('Year')), _text(v.get('Sale Price')),
+                _text(v.get('Detail Page URL')), _text(v.get('Title')), _text(v.get('Make')), _text(v.get('Model')),
+                _text(v.get('Body Style')), _text(v.get('Description')), _text(v.get('Accident Summary')),
+                _text(v.get('Accident Details')),
+                '\n'.join(
+                    ' | '.join(_text(h.get(k)) for k in ('Date', 'Record Type', 'Source', 'Details'))
+                    for h in history_by_vehicle.get(v.get('Vehicle ID'), [])
+                ),
+            ) for v in vehicles]
+        )
+        conn.executemany(
+            'INSERT INTO history_fts (run_id, vehicle_id, date, odometer, record_type, source, details) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(
+                run_id, h.get('Vehicle ID'), _text(h.get('Date')), _text(h.get('Odometer')),
+                _text(h.get('Record Type')), _text(h.get('Source')), _text(h.get('Details')),
+            ) for h in carfax_history]
+        )
+        conn.execute(
+            'INSERT INTO runs (run_id, source, vehicles, history_rows, indexed_at) VALUES (?, ?, ?, ?, ?)',
+            (run_id, source, len(vehicles), len(carfax_history), indexed_at)
+        )
+    return True
+
+
+def _safe_query(query):
+    """Quote every word, for input that is not valid FTS5 syntax."""
+    return ' '.join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+
+def search(conn, query, history=False, latest_only=False, limit=20):
+    """
+    Best matches first (bm25). Vehicle hits carry title/make/model,
+    history hits carry the history row; both have a highlighted snippet.
+    """
+    if history:
+        sql = ('SELECT run_id, vehicle_id, date, record_type, source, details, '
+               "snippet(history_fts, -1, '[', ']', '…', 12) AS snippet "
+               'FROM history_fts WHERE history_fts MATCH ?')
+    else:
+        sql = ('SELECT run_id, vehicle_id, year, make, model, title, sale_price, url, '
+               "snippet(vehicles_fts, -1, '[', ']', '…', 12) AS snippet "
+               'FROM vehicles_fts WHERE vehicles_fts MATCH ?')
+
+    if latest_only:
+        # run_id is scraped_at or a file name - order by when the run was indexed
+        sql += ' AND run_id = (SELECT run_id FROM runs ORDER BY indexed_at DESC, rowid DESC LIMIT 1)'
+    sql += ' ORDER BY rank LIMIT ?'
+
+    try:
+        rows = conn.execute(sql, (query, limit)).fetchall()
+    except sqlite3.OperationalError:
+        rows = conn.execute(sql, (_safe_query(query), limit)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def indexed_runs(conn):
+    return [dict(row) for row in conn.execute('SELECT * FROM runs ORDER BY indexed_at, rowid')]
+
+
+def print_results(results, history=False, elapsed_ms=None):
+    for r in results:
+        run_date = (r['run_id'] or '')[:10]
+        r['snippet'] = ' '.join(r['snippet'].split())
+        if history:
+            print(f"{run_date}  {r['vehicle_id']:>8}  {r['date']:<12} {r['record_type'][:20]:<20} {r['snippet']}")
+        else:
+            print(f"{run_date}  {r['vehicle_id']:>8}  {r['year']} {r['make']} {r['model']:<20} {r['snippet']}")
+
+    timing = f" in {elapsed_ms:.1f} ms" if elapsed_ms is not None else ''
+    print(f"🔎 {len(results)} results{timing}")
+
+
+def run_search(db_path, query, history=False, latest_only=False, limit=20):
+    if not os.path.exists(db_path):
+        print(f"❌ No index at {db_path} - export with --formats fts or run 'index' first")
+        return []
+
+    conn = connect(db_path)
+    try:
+        start_time = time.perf_counter()
+        results = search(conn, query, history=history, latest_only=latest_only, limit=limit)
+        print_results(results, history=history, elapsed_ms=(time.perf_counter() - start_time) * 1000)
+        return results
+    finally:
+        conn.close()
@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import carfax_canada
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def stored_run(tmp_path):
+    run_file = tmp_path / 'CurveMotors_20250101_120000.json'
+    run_file.write_text(json.dumps({
+        'vehicles': [
+            {'Vehicle ID': '1', 'Title': '2020 Ford\xa0Escape SE', 'Year': 2020, 'Make': 'Ford', 'Model': 'Escape'},
+            {'Vehicle ID': '2', 'Title': '2021 Honda\xa0CR-V EX', 'Year': 2021, 'Make': 'Honda', 'Model': 'CR-V'},
+        ],
+        'carfax_history': [{'Vehicle ID': '2', 'Date': '2021-05-01', 'Details': 'Registered'}],
+        'metadata': {'scraped_at': '2025-01-01T12:00:00', 'total_vehicles': 2, 'scrape_time_minutes': 51},
+    }), encoding='utf-8')
+    return str(run_file)
+
+
+@pytest.mark.parametrize('value', ['pdf', 'json,pdf', '', ' , '])
+def test_parse_formats_rejects_bad_input(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        carfax_canada.parse_formats(value)
+
+
+def test_parse_formats():
+    assert carfax_canada.parse_formats(' JSON, fts ') == ('json', 'fts')
+
+
+@pytest.mark.parametrize('argv, headless', [([], False), (['--headless'], True)])
+def test_no_subcommand_falls_back_to_scrape(monkeypatch, argv, headless):
+    calls = []
+    monkeypatch.setattr(carfax_canada, 'cmd_scrape', calls.append)
+    carfax_canada.main(argv)
+
+    assert len(calls) == 1
+    assert calls[0].command == 'scrape'
+    assert calls[0].headless is headless
+    assert calls[0].formats == carfax_canada.DEFAULT_FORMATS
+
+
+@pytest.mark.parametrize('argv', [
+    ['scrape', '--limit', '0'], ['export', 'run.json', '--limit', '-1'], ['parse-only', '--limit', '0'],
+])
+def test_limit_must_be_positive(argv, capsys):
+    with pytest.raises(SystemExit):
+        carfax_canada.build_parser().parse_args(argv)
+    assert 'must be at least 1' in capsys.readouterr().err
+
+
+def test_export_json_only_skips_pandas(stored_run, tmp_path):
+    out_dir = str(tmp_path / 'out')
+    code = (
+        'import sys, carfax_canada\n'
+        f'carfax_canada.main(["export", {stored_run!r}, "--formats", "json", "--output-dir", {out_dir!r}])\n'
+        'print("heavy:", [m for m in ("pandas", "openpyxl") if m in sys.modules])\n'
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=REPO_DIR, capture_output=True, text=True,
+                            encoding='utf-8', check=True)
+
+    assert 'heavy: []' in result.stdout
+    files = os.listdir(out_dir)
+    assert len(files) == 1 and files[0].startswith('CurveMotors_') and files[0].endswith('.json')
+
+    with open(os.path.join(out_dir, files[0]), encoding='utf-8') as f:
+        exported = json.load(f)
+    assert [v['Vehicle ID'] for v in exported['vehicles']] == ['1', '2']
+    assert exported['metadata']['scraped_at'] == '2025-01-01T12:00:00'
+    assert exported['metadata']['scrape_time_minutes'] == 51
+
+
+def test_export_reports_export_time(stored_run, tmp_path, capsys):
+    carfax_canada.main(['export', stored_run, '--formats', 'json', '--output-dir', str(tmp_path / 'out'),
+                        '--limit', '1'])
+    out = capsys.readouterr().out
+
+    assert 'Export time:' in out and 'EXPORT COMPLETE' in out
+    assert '51m' not in out and 'SCRAPING COMPLETE' not in out
+    assert '🚗 Vehicles: 1/1' in out
+
+
+def test_partial_export_skips_search_index(stored_run, tmp_path, capsys):
+    out_dir = tmp_path / 'out'
+    carfax_canada.main(['export', stored_run, '--formats', 'json,fts', '--output-dir', str(out_dir), '--limit', '1'])
+
+    assert 'Skipping fts' in capsys.readouterr().out
+    assert not (out_dir / 'CurveMotors_Search.db').exists()
+    assert len(list(out_dir.glob('CurveMotors_*.json'))) == 1
+
+
+def test_full_export_indexed_as_source_run(stored_run, tmp_path):
+    out_dir = tmp_path / 'out'
+    carfax_canada.main(['export', stored_run, '--formats', 'fts', '--output-dir', str(out_dir)])
+
+    conn = carfax_canada.search_index.connect(str(out_dir / 'CurveMotors_Search.db'))
+    try:
+        assert [run['run_id'] for run in carfax_canada.search_index.indexed_runs(conn)] == ['2025-01-01T12:00:00']
+    finally:
+        conn.close()
@@ -0,0 +1,116 @@
+import functools
+import http.server
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('requests')
+Image = pytest.importorskip('PIL.Image')
+
+import images
+
+
+def _gradient(path, flip=False, speck=False):
+    img = Image.new('L', (64, 48))
+    img.putdata([((63 - x) if flip else x) * 4 for y in range(48) for x in range(64)])
+    if speck:
+        img.putpixel((10, 10), 255)
+    img.save(path)
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Fixture images served over HTTP from a temp dir."""
+    site = tmp_path / 'site'
+    site.mkdir()
+    _gradient(site / 'stock.png')
+    _gradient(site / 'stock-copy.png', speck=True)
+    _gradient(site / 'own.png', flip=True)
+
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(site))
+    handler.log_message = lambda *args: None
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _vehicles(base):
+    return [
+        {'Vehicle ID': '101', 'Image URLs': [f'{base}/stock.png', f'{base}/own.png']},
+        {'Vehicle ID': '102', 'Image URLs': [f'{base}/stock-copy.png', f'{base}/missing.png']},
+        {'Image URLs': [f'{base}/stock.png']},
+    ]
+
+
+def test_rerun_downloads_nothing(server, tmp_path, capsys):
+    store = str(tmp_path / 'store')
+    manifest = images.download_images(_vehicles(server), store_dir=store, workers=4)
+    assert len(manifest) == 3
+    for entry in manifest.values():
+        assert os.path.exists(os.path.join(store, entry['path']))
+
+    capsys.readouterr()
+    images.download_images(_vehicles(server), store_dir=store, workers=4)
+    out = capsys.readouterr().out
+    assert '3 cached, 1 new' in out
+    assert '0 cached images changed' in out
+    assert '0 downloaded, 1 failed' in out
+
+
+def test_missing_image_does_not_stop_stage(server, tmp_path, capsys):
+    manifest, _ = images.run_image_stage(_vehicles(server), store_dir=str(tmp_path / 'store'))
+    assert f'{server}/missing.png' not in manifest
+    assert f'{server}/own.png' in manifest
+    assert '404' in capsys.readouterr().out
+
+
+def test_same_bytes_under_many_urls(server, tmp_path):
+    vehicles = [{'Vehicle ID': str(i), 'Image URLs': [f'{server}/stock.png?v={i}']} for i in range(40)]
+    manifest = images.download_images(vehicles, store_dir=str(tmp_path / 'store'), workers=8)
+    assert len(manifest) == 40
+    assert len({entry['path'] for entry in manifest.values()}) == 1
+
+
+def test_near_duplicates_grouped_across_vehicles(server, tmp_path):
+    manifest, reused = images.run_image_stage(_vehicles(server), store_dir=str(tmp_path / 'store'))
+    assert manifest[f'{server}/stock.png']['sha256'] != manifest[f'{server}/stock-copy.png']['sha256']
+    assert len(reused) == 1
+    assert reused[0]['vehicle_ids'] == ['101', '102']
+    assert reused[0]['urls'] == [f'{server}/stock-copy.png', f'{server}/stock.png']
+
+
+def test_missing_phash_recomputed(server, tmp_path):
+    store = str(tmp_path / 'store')
+    manifest = images.download_images(_vehicles(server), store_dir=store)
+    for entry in manifest.values():
+        entry['phash'] = None
+    images.save_manifest(store, manifest)
+
+    manifest = images.download_images(_vehicles(server), store_dir=store)
+    assert all(entry['phash'] for entry in manifest.values())
+
+
+def test_photo_replaced_at_same_url_is_fetched_again(server, tmp_path, capsys):
+    store = str(tmp_path / 'store')
+    url = f'{server}/own.png'
+    before = images.download_images(_vehicles(server), store_dir=store)[url]
+    assert before['last_modified']
+
+    # New photo under the same URL, Last-Modified moves on
+    replaced = tmp_path / 'site' / 'own.png'
+    _gradient(replaced, speck=True)
+    os.utime(replaced, (time.time() + 60, time.time() + 60))
+
+    unchanged = images.download_images(_vehicles(server), store_dir=store, revalidate=False)[url]
+    assert unchanged['sha256'] == before['sha256']
+
+    capsys.readouterr()
+    after = images.download_images(_vehicles(server), store_dir=store)[url]
+    assert '1 cached images changed' in capsys.readouterr().out
+    assert after['sha256'] != before['sha256']
+    assert os.path.exists(os.path.join(store, after['path']))
@@ -0,0 +1,130 @@
+import json
+import os
+import shutil
+import time
+import tracemalloc
+
+import pytest
+
+from profiling import REPORT_NAME, RunProfiler
+
+
+class FakeTracing:
+    """context.tracing stand-in: stop_chunk(path=...) writes the trace file."""
+
+    def __init__(self, fail_start_chunk=False):
+        self.fail_start_chunk = fail_start_chunk
+        self.calls = []
+
+    def start(self, **kwargs):
+        self.calls.append('start')
+
+    def start_chunk(self, title=None):
+        if self.fail_start_chunk:
+            raise RuntimeError('Tracing has been stopped')
+        self.calls.append(('start_chunk', title))
+
+    def stop_chunk(self, path=None):
+        self.calls.append(('stop_chunk', path))
+        if path:
+            with open(path, 'wb') as f:
+                f.write(b'PK')
+
+    def stop(self):
+        self.calls.append('stop')
+
+
+class FakeContext:
+    def __init__(self, **kwargs):
+        self.tracing = FakeTracing(**kwargs)
+
+
+def _read_report(profile_dir):
+    with open(os.path.join(profile_dir, REPORT_NAME), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_disabled_is_a_no_op():
+    profiler = RunProfiler(None)
+    profiler.start()
+    profiler.attach(FakeContext())
+    with profiler.vehicle('1') as record:
+        record['detail_error'] = ValueError('boom')
+    profiler.checkpoint('scrape')
+    assert profiler.stop() is None
+    assert profiler.context is None and profiler.vehicles == []
+
+
+def test_report_keeps_traces_of_slow_and_failed_vehicles(tmp_path):
+    profile_dir = str(tmp_path / 'profile')
+    profiler = RunProfiler(profile_dir, slow_seconds=0.05)
+    context = FakeContext()
+
+    profiler.start()
+    profiler.attach(context)
+    with profiler.vehicle('fast'):
+        pass
+    with profiler.vehicle('slow'):
+        time.sleep(0.1)
+    with profiler.vehicle('failed') as record:
+        record['detail_error'] = None
+        record['carfax_error'] = ValueError('no report')
+    profiler.checkpoint('scrape vehicles')
+    profiler.detach()
+    report_file = profiler.stop()
+
+    assert report_file == os.path.join(profile_dir, REPORT_NAME)
+    assert not tracemalloc.is_tracing()
+    assert context.tracing.calls[0] == 'start' and context.tracing.calls[-1] == 'stop'
+
+    report = _read_report(profile_dir)
+    assert report['artifacts'] == {'slow': os.path.join('traces', 'slow.zip'),
+                                   'failed': os.path.join('traces', 'failed.zip')}
+    for trace in report['artifacts'].values():
+        assert os.path.exists(os.path.join(profile_dir, trace))
+    assert not os.path.exists(os.path.join(profile_dir, 'traces', 'fast.zip'))
+
+    vehicles = {v['Vehicle ID']: v for v in report['vehicles']}
+    assert (vehicles['fast']['slow'], vehicles['fast']['failed'], vehicles['fast']['trace']) == (False, False, None)
+    assert vehicles['slow']['slow'] and not vehicles['slow']['failed']
+    assert vehicles['failed']['failed'] and list(vehicles['failed']['errors']) == ['carfax_error']
+    assert 'no report' in vehicles['failed']['errors']['carfax_error']
+
+    assert [phase['name'] for phase in report['phases']] == ['scrape vehicles']
+    assert report['python_profile'] == 'python.prof'
+    assert os.path.exists(os.path.join(profile_dir, 'python_profile.txt'))
+
+
+def test_failing_tracing_does_not_drop_the_vehicle(tmp_path, capsys):
+    profiler = RunProfiler(str(tmp_path), slow_seconds=30)
+    profiler.start()
+    profiler.attach(FakeContext(fail_start_chunk=True))
+
+    scraped = []
+    with profiler.vehicle('1') as record:
+        scraped.append('1')
+        record['detail_error'] = None
+    with profiler.vehicle('2'):
+        scraped.append('2')
+    profiler.stop()
+
+    assert scraped == ['1', '2']
+    assert profiler.context is None
+    assert 'Tracing stopped' in capsys.readouterr().out
+    assert sorted(v['Vehicle ID'] for v in _read_report(str(tmp_path))['vehicles']) == ['1', '2']
+
+
+def test_report_write_error_does_not_raise(tmp_path, capsys):
+    profile_dir = str(tmp_path / 'profile')
+    profiler = RunProfiler(profile_dir)
+    profiler.start()
+    shutil.rmtree(profile_dir)
+
+    with pytest.raises(ValueError, match='scrape failed'):
+        try:
+            raise ValueError('scrape failed')
+        finally:
+            assert profiler.stop() is None
+
+    assert not tracemalloc.is_tracing()
+    assert 'Run report not written' in capsys.readouterr().out
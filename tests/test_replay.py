@@ -0,0 +1,89 @@
+import functools
+import http.server
+import threading
+
+import pytest
+
+import carfax_canada
+
+
+LISTING = '''<!DOCTYPE html>
+<html><body>
+<div id="cars">
+  <div id="vehicle-1"><a href="/cars/used/1">2019 Ford&nbsp;Escape SE</a></div>
+  <div id="vehicle-2"><a href="/cars/used/2">2020 Honda&nbsp;CR-V EX</a></div>
+</div>
+<button class="load-more">Load More</button>
+<script>
+document.querySelector('.load-more').addEventListener('click', async (event) => {
+  event.target.remove();
+  const more = await (await fetch('/more.json')).json();
+  for (const car of more) {
+    const card = document.createElement('div');
+    card.id = 'vehicle-' + car.id;
+    card.innerHTML = '<a href="/cars/used/' + car.id + '">' + car.title + '</a>';
+    document.getElementById('cars').appendChild(card);
+  }
+});
+</script>
+</body></html>
+'''
+
+MORE = '[{"id": 3, "title": "2021 Toyota RAV4 LE"}, {"id": 4, "title": "2018 Nissan Rogue SV"}]'
+
+
+@pytest.fixture
+def site(tmp_path):
+    root = tmp_path / 'site'
+    root.mkdir()
+    (root / 'cars.html').write_text(LISTING, encoding='utf-8')
+    (root / 'more.json').write_text(MORE, encoding='utf-8')
+
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(root))
+    handler.log_message = lambda *args: None
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd, f'http://127.0.0.1:{httpd.server_address[1]}/cars.html'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _load(playwright, url, **har):
+    browser, context = carfax_canada.new_browser_context(playwright, headless=True, **har)
+    try:
+        page = context.new_page()
+        cards = carfax_canada.load_inventory(page, url=url)
+        return [card.get_attribute('id') for card in cards], page.content()
+    finally:
+        context.close()
+        browser.close()
+
+
+def test_replay_offline_matches_recording(site, tmp_path, monkeypatch):
+    sync_api = pytest.importorskip('playwright.sync_api')
+    httpd, url = site
+    har = str(tmp_path / 'net.har.zip')
+    monkeypatch.setattr(carfax_canada, 'INVENTORY_PAUSE', 0.3)
+
+    with sync_api.sync_playwright() as p:
+        try:
+            p.chromium.launch(headless=True).close()
+        except sync_api.Error as e:
+            pytest.skip(f'Chromium not installed: {str(e).splitlines()[0]}')
+
+        recorded_ids, recorded_dom = _load(p, url, record_har=har)
+
+        # Offline: anything not in the HAR is aborted, the server is gone
+        httpd.shutdown()
+        replayed_ids, replayed_dom = _load(p, url, replay_har=har)
+
+    assert recorded_ids == ['vehicle-1', 'vehicle-2', 'vehicle-3', 'vehicle-4']
+    assert replayed_ids == recorded_ids
+    assert replayed_dom == recorded_dom
+
+
+def test_missing_replay_file_is_a_usage_error(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        carfax_canada.build_parser().parse_args(['scrape', '--replay', str(tmp_path / 'missing.har.zip')])
+    assert exit_info.value.code == 2
+    assert 'no such file' in capsys.readouterr().err
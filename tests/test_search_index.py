@@ -0,0 +1,83 @@
+import sqlite3
+
+import pytest
+
+import search_index
+
+
+def _run(vehicle_id, body_style, details):
+    vehicles = [{
+        'Vehicle ID': vehicle_id, 'Year': 2020, 'Make': 'Ford', 'Model': 'Transit Connect',
+        'Title': f'2020 Ford Transit Connect {body_style}', 'Body Style': body_style,
+        'Description': 'N/A', 'Sale Price': '$25,000', 'Detail Page URL': f'https://example.com/{vehicle_id}',
+    }]
+    history = [{'Vehicle ID': vehicle_id, 'Date': '2021-05-01', 'Record Type': 'Accident',
+                'Source': 'Police report', 'Details': details}]
+    return vehicles, history
+
+
+@pytest.fixture
+def conn():
+    conn = search_index.connect(':memory:')
+    yield conn
+    conn.close()
+
+
+def test_index_and_search(conn):
+    assert search_index.index_run(conn, '2025-01-01T10:00:00', *_run('1', 'Van', 'Collision in Ontario'))
+    assert not search_index.index_run(conn, '2025-01-01T10:00:00', *_run('1', 'Van', 'Collision in Ontario'))
+
+    results = search_index.search(conn, 'van collision ontario')
+    assert [r['vehicle_id'] for r in results] == ['1']
+    assert '[' in results[0]['snippet']
+
+    history = search_index.search(conn, 'police', history=True)
+    assert [(r['vehicle_id'], r['record_type']) for r in history] == [('1', 'Accident')]
+
+    # Not valid FTS5 syntax: retried with every word quoted
+    assert search_index.search(conn, 'transit "connect') != []
+
+
+def test_latest_only_follows_indexing_order(conn):
+    # File names sort after ISO run ids, MAX(run_id) would pick the older run
+    search_index.index_run(conn, 'CurveMotors_20250101_100000.json', *_run('1', 'Van', 'Collision'))
+    search_index.index_run(conn, '2025-03-01T09:00:00', *_run('2', 'Van', 'Collision'))
+
+    assert [r['vehicle_id'] for r in search_index.search(conn, 'collision', latest_only=True)] == ['2']
+    assert len(search_index.search(conn, 'collision')) == 2
+
+    # Reindexing the older run does not make it the latest
+    search_index.index_run(conn, 'CurveMotors_20250101_100000.json', *_run('1', 'Van', 'Collision'), reindex=True)
+    assert [r['vehicle_id'] for r in search_index.search(conn, 'collision', latest_only=True)] == ['2']
+
+
+def test_reindex_replaces_run(conn):
+    search_index.index_run(conn, 'run', *_run('1', 'Van', 'Collision'))
+    assert search_index.index_run(conn, 'run', *_run('1', 'Sedan', 'Hail damage'), reindex=True)
+
+    assert search_index.search(conn, 'van') == []
+    assert [r['vehicle_id'] for r in search_index.search(conn, 'sedan hail')] == ['1']
+    assert [r['history_rows'] for r in search_index.indexed_runs(conn)] == [1]
+
+
+def test_failed_reindex_keeps_old_run(conn):
+    search_index.index_run(conn, 'run', *_run('1', 'Van', 'Collision'))
+    vehicles, history = _run('1', 'Sedan', 'Hail damage')
+    history[0]['Vehicle ID'] = object()  # cannot be bound
+
+    with pytest.raises(sqlite3.Error):
+        search_index.index_run(conn, 'run', vehicles, history, reindex=True)
+
+    assert [r['vehicle_id'] for r in search_index.search(conn, 'van')] == ['1']
+    assert len(search_index.indexed_runs(conn)) == 1
+
+
+def test_scraper_placeholders_not_indexed(conn):
+    vehicles, history = _run('1', 'Van', 'Collision')
+    vehicles[0]['Accident Summary'] = 'No accidents reported'
+    vehicles.append(dict(vehicles[0], **{'Vehicle ID': '2', 'Accident Summary': 'No Accident/Damage Records Found'}))
+    search_index.index_run(conn, 'run', vehicles, history)
+
+    # Only the real Carfax summary matches, not the default of vehicle 1
+    assert [r['vehicle_id'] for r in search_index.search(conn, 'accident_summary:accidents')] == ['2']
+    assert search_index.search(conn, 'accident_summary:reported') == []
@@ -0,0 +1,109 @@
+import json
+import os
+
+import pytest
+
+import title_parser
+from title_parser import parse_title
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def fresh_index(monkeypatch):
+    """Module-level index state as at import, restored after the test."""
+    monkeypatch.setattr(title_parser, 'KNOWN_MAKES', dict(title_parser.KNOWN_MAKES))
+    monkeypatch.setattr(title_parser, 'LEARNED_INDEX', {})
+    monkeypatch.setattr(title_parser, 'MODEL_MAX_WORDS', title_parser._max_words(title_parser.MODEL_INDEX))
+    monkeypatch.setattr(title_parser, '_SEEN_MODELS', {})
+    parse_title.cache_clear()
+    yield
+    parse_title.cache_clear()
+
+
+@pytest.fixture
+def seeded(fresh_index):
+    title_parser.seed_from_dir(REPO_DIR)
+
+
+def _write_run(path, titles):
+    path.write_text(json.dumps({'vehicles': [{'Title': title, 'Model': 'untrusted'} for title in titles]}),
+                    encoding='utf-8')
+
+
+@pytest.mark.parametrize('title, expected', [
+    ('2021 Land Rover\xa0Discovery Sport SE 4x4 * NO ACCIDENTS', (2021, 'Land Rover', 'Discovery Sport')),
+    ('2019 Land Rover Range Rover Evoque SE', (2019, 'Land Rover', 'Range Rover Evoque')),
+    ('2020 Honda\xa0HR V LX AWD', (2020, 'Honda', 'HR-V')),
+    ('2018 Nissan\xa0NV200 Compact Cargo SV', (2018, 'Nissan', 'NV200 Compact Cargo')),
+    ('2017 Nissan\xa0NV200 SV', (2017, 'Nissan', 'NV200')),
+    ('2022 Toyota\xa0RAV4 Prime XSE', (2022, 'Toyota', 'RAV4 Prime')),
+    ('2020 Ford\xa0Transit Connect XLT', (2020, 'Ford', 'Transit Connect')),
+    ('2020 Ford\xa0F 150 Lariat', (2020, 'Ford', 'F-150')),
+    ('2015 mini\xa0countryman', (2015, 'MINI', 'Countryman')),
+    ('2014 Pontiac\xa0Vibe GT * LOW KM', (2014, 'Pontiac', 'Vibe GT')),
+    ('2022\xa0', (2022, 'N/A', 'N/A')),
+    ('Great deal, no year', ('N/A', 'N/A', 'N/A')),
+    ('N/A', ('N/A', 'N/A', 'N/A')),
+    ('', ('N/A', 'N/A', 'N/A')),
+])
+def test_parse_title(seeded, title, expected):
+    assert parse_title(title) == expected
+    assert parse_title.__wrapped__(title) == expected
+
+
+def test_models_learned_from_stored_titles(tmp_path, fresh_index):
+    _write_run(tmp_path / 'CurveMotors_20250101_000000.json', [
+        '2019 Toyota\xa0Highlander XLE AWD * NO ACCIDENTS',
+        '2021 Toyota\xa0Highlander Limited Platinum',
+        '2023 Hyundai\xa0Tucson Ultimate AWD',
+        '2022 Hyundai\xa0Tucson Preferred Trend',
+        '2021 Ford\xa0Mustang Mach-E Select',
+        '2022 Ford\xa0Mustang Mach-E GT',
+        '2020 Ford\xa0Mustang GT Premium',
+    ])
+    held_out = {
+        '2020 Toyota Highlander XLE AWD': 'Highlander XLE',
+        '2022 Hyundai Tucson Preferred AWD': 'Tucson Preferred',
+        '2021 Ford Mustang Mach-E Premium': 'Mustang Mach-E Premium',
+    }
+    assert {title: parse_title(title)[2] for title in held_out} == held_out
+
+    assert title_parser.seed_from_dir(str(tmp_path)) > 0
+    assert {title: parse_title(title)[2] for title in held_out} == {
+        '2020 Toyota Highlander XLE AWD': 'Highlander',
+        '2022 Hyundai Tucson Preferred AWD': 'Tucson',
+        '2021 Ford Mustang Mach-E Premium': 'Mustang Mach-E',
+    }
+    assert parse_title('2019 Ford Mustang EcoBoost')[2] == 'Mustang'
+
+
+def test_known_models_override_learned(tmp_path, fresh_index):
+    # Both share "Model" - learned alone, a Tesla would parse as "Model"
+    _write_run(tmp_path / 'CurveMotors_20250101_000000.json', [
+        '2019 Tesla\xa0Model 3 Standard Range Plus', '2016 Tesla\xa0Model X 90D AWD',
+    ])
+    title_parser.seed_from_dir(str(tmp_path))
+    assert parse_title('2021 Tesla Model Y Long Range')[2] == 'Model Y'
+
+
+def test_seed_learns_makes(tmp_path, fresh_index):
+    _write_run(tmp_path / 'CurveMotors_20250101_000000.json', [
+        '2021 Mercedes-AMG\xa0GT 53 4MATIC+', 'no year\xa0here', None,
+    ])
+    (tmp_path / 'CurveMotors_WatchState.json').write_text(json.dumps({'vehicles': {'1': {}}}), encoding='utf-8')
+
+    assert parse_title('2020 MERCEDES-AMG GT 63') == (2020, 'MERCEDES-AMG', 'GT 63')
+    assert title_parser.seed_from_dir(str(tmp_path)) == 1
+    assert parse_title('2020 MERCEDES-AMG GT 63') == (2020, 'Mercedes-AMG', 'GT 63')
+    assert title_parser.seed_from_dir(str(tmp_path)) == 0
+
+
+def test_seed_reads_newest_runs_only(tmp_path, fresh_index):
+    _write_run(tmp_path / 'CurveMotors_20240101_000000.json', ['2020 Lucid\xa0Air Touring'])
+    _write_run(tmp_path / 'CurveMotors_20250101_000000.json', ['2021 Rivian\xa0R1T Adventure'])
+
+    title_parser.seed_from_dir(str(tmp_path), runs=1)
+    assert 'RIVIAN' in title_parser.KNOWN_MAKES
+    assert 'LUCID' not in title_parser.KNOWN_MAKES
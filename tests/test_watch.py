@@ -0,0 +1,57 @@
+from watch import diff_snapshots, load_state, save_state
+
+
+def _vehicle(vehicle_id, price='$20,000', odometer='50,000 km'):
+    return {'Vehicle ID': vehicle_id, 'Sale Price': price, 'Original Price': 'N/A', 'Odometer': odometer}
+
+
+def _kinds(events):
+    return sorted((e['event'], e['vehicle_id']) for e in events)
+
+
+def test_added_and_changed():
+    old = {'1': _vehicle('1'), '2': _vehicle('2')}
+    new = {'1': _vehicle('1', price='$18,500'), '2': _vehicle('2'), '3': _vehicle('3')}
+
+    events = diff_snapshots(old, new)
+    assert _kinds(events) == [('added', '3'), ('changed', '1')]
+    changed = next(e for e in events if e['event'] == 'changed')
+    assert changed['changes'] == {'Sale Price': ['$20,000', '$18,500']}
+
+
+def test_partial_load_does_not_remove():
+    full = {vehicle_id: _vehicle(vehicle_id) for vehicle_id in ('1', '2', '3')}
+    partial = {'1': _vehicle('1')}
+    missing = {}
+
+    assert diff_snapshots(full, partial, missing) == []
+    assert missing == {'2': 1, '3': 1}
+
+    # Listing loads fully again: nothing happened
+    assert diff_snapshots(full, full, missing) == []
+    assert missing == {}
+
+
+def test_removed_after_two_polls():
+    old = {'1': _vehicle('1'), '2': _vehicle('2')}
+    new = {'1': _vehicle('1')}
+    missing = {}
+
+    assert diff_snapshots(old, new, missing) == []
+    events = diff_snapshots(old, new, missing)
+    assert _kinds(events) == [('removed', '2')]
+    assert events[0]['vehicle'] == old['2']
+    assert missing == {}
+
+
+def test_removed_immediately_when_configured():
+    events = diff_snapshots({'1': _vehicle('1')}, {}, removed_after=1)
+    assert _kinds(events) == [('removed', '1')]
+
+
+def test_state_round_trip(tmp_path):
+    state_file = str(tmp_path / 'state.json')
+    assert load_state(state_file) == (None, {})
+
+    save_state(state_file, {'1': _vehicle('1')}, {'2': 1})
+    assert load_state(state_file) == ({'1': _vehicle('1')}, {'2': 1})
@@ -0,0 +1,345 @@
+"""
+Title -> Year / Make / Model parser
+
+- Patterns compiled once at import time
+- Make/model dictionary index (longest match wins, multi-word models supported)
+- Results memoized per title
+- Makes and models learned from the newest stored runs at startup (seed_from_runs),
+  hand-typed KNOWN_MODELS only override what the titles can't teach
+- Run as a script to benchmark against the stored runs' JSON
+"""
+import glob
+import json
+import os
+import re
+from functools import lru_cache
+
+
+YEAR_RE = re.compile(r'\b(?:19|20)\d{2}\b')
+
+# The dealer site separates make and model with a non-breaking space,
+# e.g. "2021 Land Rover\xa0Discovery Sport SE 4x4 * ..."
+MAKE_SEPARATOR = '\xa0'
+
+# Fallback for models neither known nor learned: the first word after the make,
+# plus following words until one of these (or a non-word token) shows up.
+# Learned models stop at them too.
+STOP_WORDS = frozenset({
+    'CARGO', 'VAN', 'AWD', 'FWD', 'RWD', '4X4', '4WD',
+    'WITH', 'SPORT', 'LIMITED', 'LTD', 'SLT', 'SE', 'EX', 'LX',
+    'FULLY', 'LOADED', 'LOW', 'KM', 'BACKUP', 'CAMERA',
+    'CRUISE', 'CONTROL', 'LEATHER', 'SUNROOF', 'NAVIGATION',
+    'SHELVES', 'SEATS', 'NO', 'ACCIDENTS', 'NEVER', 'MANUAL', '*', '/', '-'
+})
+
+# Overrides, checked before learned models: names containing a stop word
+# ("Discovery Sport"), trims the titles share more often than the model
+# ("Transit Connect XL" is not a model) and makes with a single listing.
+# Longer models must be listed as well as their base model ("RAV4 Prime", "RAV4").
+KNOWN_MODELS = {
+    'Audi': ['A3', 'A4', 'Q5 Sportback', 'Q7', 'Q8'],
+    'BMW': ['3 Series', '430i', 'X1', 'X4', 'X6'],
+    'Chevrolet': ['Camaro'],
+    'Ford': ['Edge', 'F-150'],
+    'Honda': ['HR-V'],
+    'INFINITI': ['QX50', 'QX55'],
+    'Kia': ['Sportage'],
+    'Land Rover': ['Discovery Sport', 'Range Rover Evoque', 'Range Rover Sport'],
+    'Mercedes-Benz': ['C-Class', 'CLA-Class', 'E-Class', 'G-Class', 'GLA'],
+    'MINI': ['5 Door', 'Countryman'],
+    'Nissan': ['LEAF', 'NV200 Compact Cargo', 'Pathfinder'],
+    'Ram': ['ProMaster City'],
+    'Tesla': ['Model 3', 'Model S', 'Model X', 'Model Y'],
+    'Toyota': ['Camry', 'Corolla Cross', 'RAV4 Prime'],
+}
+
+# Stored runs' JSON, as written by export_results(); seed_from_dir reads the newest SEED_RUNS
+RUN_FILES = 'CurveMotors_[0-9]*.json'
+SEED_RUNS = 5
+
+# A word prefix becomes a learned model once this many different titles of the make share it
+MIN_SHARED_TITLES = 2
+LEARNED_MAX_WORDS = 3
+
+# Makes spelled with more than one word, matched before splitting on spaces
+MULTI_WORD_MAKES = ['Alfa Romeo', 'Aston Martin', 'Land Rover', 'Rolls Royce', 'Rolls-Royce']
+
+
+def _normalize_words(text, max_words=None):
+    """Upper-cased words, hyphens count as spaces: 'HR V' and 'HR-V' compare equal."""
+    return text.replace('-', ' ').upper().split(None, max_words or -1)[:max_words]
+
+
+def _build_index(known_models):
+    """
+    make (upper) -> first normalized model word -> [(normalized model words, model)]
+    Candidate lists are sorted longest first so the first prefix match wins.
+    """
+    index = {}
+    for make, models in known_models.items():
+        by_first_word = index.setdefault(make.upper(), {})
+        for model in models:
+            norm = _normalize_words(model)
+            by_first_word.setdefault(norm[0], []).append((norm, model))
+    for by_first_word in index.values():
+        for candidates in by_first_word.values():
+            candidates.sort(key=lambda c: len(c[0]), reverse=True)
+    return index
+
+
+def _model_count(index):
+    return sum(len(candidates) for by_first_word in index.values() for candidates in by_first_word.values())
+
+
+def _max_words(*indexes):
+    return max((len(norm) for index in indexes for by_first_word in index.values()
+                for candidates in by_first_word.values() for norm, _ in candidates), default=1)
+
+
+MODEL_INDEX = _build_index(KNOWN_MODELS)
+LEARNED_INDEX = {}
+# Only this many title words can be part of a known or learned model - the rest is never normalized
+MODEL_MAX_WORDS = _max_words(MODEL_INDEX)
+KNOWN_MAKES = {make.upper(): make for make in list(KNOWN_MODELS) + MULTI_WORD_MAKES}
+
+# make (upper) -> {upper-cased model words: model words} of every title seen by seed_from_runs
+_SEEN_MODELS = {}
+
+
+def _model_words(rest):
+    """Leading words of the text after the make, up to a stop word or non-word token."""
+    words = []
+    for word in rest.split(None, LEARNED_MAX_WORDS)[:LEARNED_MAX_WORDS]:
+        if word.upper() in STOP_WORDS or not word.replace('-', '').isalnum():
+            break
+        words.append(word)
+    return words
+
+
+def _learn_models(seen_models):
+    """
+    make -> models: per distinct title, its longest word prefix that
+    MIN_SHARED_TITLES different titles of the same make start with.
+    """
+    learned = {}
+    for make_key, titles in seen_models.items():
+        prefix_counts = {}
+        for key in titles:
+            for length in range(1, len(key) + 1):
+                prefix_counts[key[:length]] = prefix_counts.get(key[:length], 0) + 1
+
+        models = learned.setdefault(make_key, {})
+        for key, words in titles.items():
+            for length in range(len(key), 0, -1):
+                if prefix_counts[key[:length]] >= MIN_SHARED_TITLES:
+                    models.setdefault(key[:length], ' '.join(words[:length]))
+                    break
+    return {make: list(models.values()) for make, models in learned.items() if models}
+
+
+def seed_from_runs(json_files):
+    """
+    Learn makes and models from stored runs' JSON titles (the text around the
+    non-breaking space) - stored Model values came from the old heuristic and
+    are not trusted. Returns how many makes and models were new.
+    """
+    global LEARNED_INDEX, MODEL_MAX_WORDS
+
+    new_makes = 0
+    for json_file in json_files:
+        try:
+            with open(json_file, encoding='utf-8') as f:
+                vehicles = json.load(f).get('vehicles')
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"⚠️  Skipping {json_file}: {str(e)[:50]}")
+            continue
+        if not isinstance(vehicles, list):
+            continue
+
+        for vehicle in vehicles:
+            title = vehicle.get('Title') or ''
+            if MAKE_SEPARATOR not in title:
+                continue
+            year_match = YEAR_RE.search(title)
+            if not year_match:
+                continue
+            make, rest = title[year_match.end():].split(MAKE_SEPARATOR, 1)
+            make = ' '.join(make.split())
+            if not make:
+                continue
+            if make.upper() not in KNOWN_MAKES:
+                KNOWN_MAKES[make.upper()] = make
+                new_makes += 1
+
+            words = _model_words(rest)
+            if words:
+                key = tuple(word.upper() for word in words)
+                _SEEN_MODELS.setdefault(make.upper(), {}).setdefault(key, words)
+
+    learned_index = _build_index(_learn_models(_SEEN_MODELS))
+    new_models = max(_model_count(learned_index) - _model_count(LEARNED_INDEX), 0)
+
+    if new_makes or learned_index != LEARNED_INDEX:
+        LEARNED_INDEX = learned_index
+        MODEL_MAX_WORDS = _max_words(MODEL_INDEX, LEARNED_INDEX)
+        parse_title.cache_clear()
+    return new_makes + new_models
+
+
+def seed_from_dir(directory='.', runs=SEED_RUNS):
+    """
+    seed_from_runs() over the newest stored runs in directory (file names
+    sort by timestamp), so startup cost does not grow with the run history.
+    """
+    return seed_from_runs(sorted(glob.glob(os.path.join(directory, RUN_FILES)))[-runs:])
+
+
+def _split_make(after_year):
+    """Return (make, rest of title) for the text following the year."""
+    if MAKE_SEPARATOR in after_year:
+        make, rest = after_year.split(MAKE_SEPARATOR, 1)
+        return ' '.join(make.split()), rest
+
+    words = after_year.split()
+    if not words:
+        return 'N/A', ''
+
+    # Multi-word makes ("Land Rover") when the separator is missing
+    for length in (2, 3):
+        candidate = ' '.join(words[:length])
+        if len(words) >= length and candidate.upper() in KNOWN_MAKES:
+            return candidate, ' '.join(words[length:])
+
+    return words[0], ' '.join(words[1:])
+
+
+def _match_model(make_key, rest):
+    """Longest known, then longest learned model that prefixes the rest of the title, else heuristic."""
+    head = None
+    for index in (MODEL_INDEX, LEARNED_INDEX):
+        by_first_word = index.get(make_key)
+        if not by_first_word:
+            continue
+        if head is None:
+            head = _normalize_words(rest, MODEL_MAX_WORDS)
+        for norm_model, model in by_first_word.get(head[0] if head else '', ()):
+            if head[:len(norm_model)] == norm_model:
+                return model
+
+    words = rest.split(None, 3)
+    if not words:
+        return 'N/A'
+
+    model_words = [words[0]]
+    for word in words[1:3]:
+        if word.upper() in STOP_WORDS or not word.replace('-', '').isalnum():
+            break
+        model_words.append(word)
+    return ' '.join(model_words)
+
+
+@lru_cache(maxsize=4096)
+def parse_title(title):
+    """
+    Parse a listing title into (year, make, model).
+    Missing parts are 'N/A', same as every other field.
+    """
+    if not title or title == 'N/A':
+        return 'N/A', 'N/A', 'N/A'
+
+    year_match = YEAR_RE.search(title)
+    if not year_match:
+        return 'N/A', 'N/A', 'N/A'
+
+    make, rest = _split_make(title[year_match.end():].strip())
+    if make == 'N/A':
+        return int(year_match.group(0)), 'N/A', 'N/A'
+
+    make_key = make.upper()
+    return int(year_match.group(0)), KNOWN_MAKES.get(make_key, make), _match_model(make_key, rest)
+
+
+# ========================================
+# BENCHMARK
+# ========================================
+
+def _legacy_parse(complete_title):
+    """The per-vehicle logic previously inlined in scrape_curve_motors_perfect()."""
+    year_match = re.search(r'\b(19|20)\d{2}\b', complete_title)
+    year = int(year_match.group(0)) if year_match else 'N/A'
+    if not year_match:
+        return year, 'N/A', 'N/A'
+
+    words = complete_title[year_match.end():].strip().split()
+    make = words[0] if words else 'N/A'
+
+    stop_words = {
+        'CARGO', 'VAN', 'AWD', 'FWD', 'RWD', '4X4', '4WD',
+        'WITH', 'SPORT', 'LIMITED', 'LTD', 'SLT', 'SE', 'EX', 'LX',
+        'FULLY', 'LOADED', 'LOW', 'KM', 'BACKUP', 'CAMERA',
+        'CRUISE', 'CONTROL', 'LEATHER', 'SUNROOF', 'NAVIGATION',
+        'SHELVES', 'SEATS', '*', '/', '-'
+    }
+
+    model_words = []
+    for word in words[1:]:
+        if word.upper() in stop_words or not word.replace('-', '').isalnum():
+            break
+        model_words.append(word)
+        if len(model_words) >= 3:
+            break
+
+    model = ' '.join(model_words) if model_words else (words[1] if len(words) > 1 else 'N/A')
+    return year, make, model
+
+
+def benchmark(json_files, rounds=200):
+    """
+    Time legacy vs new parsing over every title in the given runs.
+    The uncached parser is the fair comparison - a scrape sees each title once.
+    """
+    import time
+
+    titles = []
+    for json_file in json_files:
+        with open(json_file, encoding='utf-8') as f:
+            titles.extend(v.get('Title') or 'N/A' for v in json.load(f).get('vehicles', []))
+
+    print(f"📊 {len(titles)} titles x {rounds} rounds")
+
+    uncached_parse = parse_title.__wrapped__
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        legacy = [_legacy_parse(t) for t in titles]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        parsed = [uncached_parse(t) for t in titles]
+    uncached_time = time.perf_counter() - start
+
+    parse_title.cache_clear()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        [parse_title(t) for t in titles]
+    cached_time = time.perf_counter() - start
+
+    print(f"   Legacy:              {legacy_time * 1000:.1f} ms")
+    print(f"   Parser (uncached):   {uncached_time * 1000:.1f} ms ({legacy_time / uncached_time:.2f}x)")
+    print(f"   Parser (cache hits): {cached_time * 1000:.1f} ms ({legacy_time / cached_time:.1f}x, "
+          f"repeated titles only)")
+
+    changed = [(t, old, new) for t, old, new in zip(titles, legacy, parsed) if old != new]
+    print(f"   Changed results: {len(changed)}/{len(titles)}")
+    for title, old, new in changed:
+        print(f"   - {title[:60]!r}")
+        print(f"       {old[1]} / {old[2]}  ->  {new[1]} / {new[2]}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    files = sys.argv[1:] or sorted(glob.glob(RUN_FILES))
+    seed_from_runs(files)
+    benchmark(files)
@@ -0,0 +1,205 @@
+"""
+Watch mode
+
+- One warm browser, polls only the /cars listing
+- Diffs against the last snapshot by Vehicle ID, price and odometer
+- Emits added / removed / changed events to a JSONL feed (and optionally a local webhook)
+- Removed only after a vehicle is missing from consecutive polls (partial loads drop cards)
+- Only added / changed vehicles get the detail page + Carfax scrape
+
+Run:  python carfax_canada.py watch --interval 300 --webhook http://localhost:8000/events
+"""
+import json
+import os
+import time
+import urllib.request
+from datetime import datetime
+
+from carfax_canada import new_browser_context, load_inventory, parse_card, scrape_detail_page, scrape_carfax
+from title_parser import seed_from_dir
+
+
+WATCH_FIELDS = ('Sale Price', 'Original Price', 'Odometer')
+
+# A listing that did not finish loading drops cards for one poll - a vehicle
+# is only reported removed once it has been missing from this many polls in a row
+REMOVED_AFTER_POLLS = 2
+
+
+def take_snapshot(page):
+    """Vehicle ID -> listing-card fields, from the /cars page only."""
+    snapshot = {}
+    for card in load_inventory(page):
+        try:
+            vehicle_data = parse_card(card)
+        except Exception as e:
+            print(f"   ⚠️  Card error: {str(e)[:50]}")
+            continue
+        if vehicle_data:
+            snapshot[vehicle_data['Vehicle ID']] = vehicle_data
+    return snapshot
+
+
+def diff_snapshots(old, new, missing=None, removed_after=REMOVED_AFTER_POLLS):
+    """
+    added / removed / changed events between two snapshots.
+    missing (Vehicle ID -> consecutive polls absent) is updated in place;
+    vehicles still in it are not confirmed removed and belong in the next `old`.
+    """
+    detected_at = datetime.now().isoformat()
+    events = []
+    if missing is None:
+        missing = {}
+
+    for vehicle_id, vehicle in new.items():
+        missing.pop(vehicle_id, None)
+        if vehicle_id not in old:
+            events.append({'event': 'added', 'vehicle_id': vehicle_id, 'detected_at': detected_at,
+                           'vehicle': vehicle})
+            continue
+
+        changes = {
+            field: [old[vehicle_id].get(field), vehicle.get(field)]
+            for field in WATCH_FIELDS
+            if old[vehicle_id].get(field) != vehicle.get(field)
+        }
+        if changes:
+            events.append({'event': 'changed', 'vehicle_id': vehicle_id, 'detected_at': detected_at,
+                           'changes': changes, 'vehicle': vehicle})
+
+    for vehicle_id, vehicle in old.items():
+        if vehicle_id in new:
+            continue
+        missing[vehicle_id] = missing.get(vehicle_id, 0) + 1
+        if missing[vehicle_id] >= removed_after:
+            del missing[vehicle_id]
+            events.append({'event': 'removed', 'vehicle_id': vehicle_id, 'detected_at': detected_at,
+                           'vehicle': vehicle})
+
+    return events
+
+
+def enrich_events(context, events):
+    """Detail page + Carfax for added / changed vehicles only."""
+    for event in events:
+        if event['event'] == 'removed':
+            continue
+        vehicle_data = dict(event['vehicle'])
+        history = []
+        print(f"   🔎 {event['event']}: {vehicle_data['Detail Page URL'].split('/')[-1][:40]}")
+        try:
+            scrape_detail_page(context, vehicle_data)
+            scrape_carfax(context, vehicle_data, history)
+        except Exception as e:
+            print(f"   ⚠️  Enrich error: {str(e)[:50]}")
+        event['vehicle'] = vehicle_data
+        event['carfax_history'] = history
+
+
+def emit_events(events, feed_file, webhook_url=None):
+    """Append events to the JSONL feed and POST each one to the webhook."""
+    with open(feed_file, 'a', encoding='utf-8') as f:
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+    if not webhook_url:
+        return
+
+    for event in events:
+        request = urllib.request.Request(
+            webhook_url,
+            data=json.dumps(event, ensure_ascii=False).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        try:
+            urllib.request.urlopen(request, timeout=10).close()
+        except Exception as e:
+            print(f"   ⚠️  Webhook error: {str(e)[:50]}")
+
+
+def load_state(state_file):
+    """(vehicles, missing) of the last poll, (None, {}) before the baseline."""
+    if not os.path.exists(state_file):
+        return None, {}
+    with open(state_file, encoding='utf-8') as f:
+        state = json.load(f)
+    return state['vehicles'], state.get('missing', {})
+
+
+def save_state(state_file, snapshot, missing=None):
+    tmp_file = state_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'taken_at': datetime.now().isoformat(), 'vehicles': snapshot, 'missing': missing or {}}, f,
+                  indent=2, ensure_ascii=False)
+    os.replace(tmp_file, state_file)
+
+
+def watch(interval=300, feed_file='CurveMotors_Events.jsonl', state_file='CurveMotors_WatchState.json',
+          webhook_url=None, enrich=True, headless=True, max_polls=None):
+    """
+    Poll the listing every `interval` seconds until interrupted (or max_polls).
+    The first poll without a state file only records the baseline.
+    """
+    from playwright.sync_api import sync_playwright
+
+    previous, missing = load_state(state_file)
+    polls = 0
+    seed_from_dir(os.path.dirname(state_file) or '.')
+
+    print("=" * 80)
+    print("👀 CURVE MOTORS - WATCH MODE")
+    print("=" * 80)
+    print(f"⏱️  Every {interval}s, feed: {feed_file}\n")
+
+    with sync_playwright() as p:
+        browser, context = new_browser_context(p, headless=headless)
+        page = context.new_page()
+
+        try:
+            while True:
+                polls += 1
+                start_time = time.time()
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] Poll #{polls}")
+
+                try:
+                    snapshot = take_snapshot(page)
+
+                    if not snapshot:
+                        print("   ⚠️  Empty listing - keeping previous snapshot")
+                    elif previous is None:
+                        print(f"   📌 Baseline: {len(snapshot)} vehicles")
+                        previous = snapshot
+                        save_state(state_file, snapshot)
+                    else:
+                        events = diff_snapshots(previous, snapshot, missing)
+                        if events:
+                            if enrich:
+                                enrich_events(context, events)
+                            emit_events(events, feed_file, webhook_url)
+
+                        counts = {kind: sum(e['event'] == kind for e in events)
+                                  for kind in ('added', 'removed', 'changed')}
+                        print(f"   ✅ {len(snapshot)} vehicles: +{counts['added']} "
+                              f"-{counts['removed']} ~{counts['changed']} ({time.time() - start_time:.0f}s)")
+                        if missing:
+                            print(f"   ⏳ {len(missing)} missing from the listing - removed if still gone "
+                                  f"after {REMOVED_AFTER_POLLS} polls")
+
+                        # Unconfirmed removals stay in the state, so they are compared again next poll
+                        previous = {**{vehicle_id: previous[vehicle_id] for vehicle_id in missing}, **snapshot}
+                        save_state(state_file, previous, missing)
+
+                except Exception as e:
+                    print(f"   ❌ Poll error: {str(e)[:60]}")
+
+                if max_polls and polls >= max_polls:
+                    break
+                time.sleep(interval)
+
+        except KeyboardInterrupt:
+            print("\n🛑 Watch stopped")
+
+        finally:
+            browser.close()
+